@@ -1,4 +1,7 @@
+import asyncio
+import re
 import threading
+import time
 from typing import List, Optional, Union, Callable, Any
 from urllib.parse import urlparse
 
@@ -8,12 +11,26 @@ from llama_stack_client.lib.agents.tool_parser import ToolParser
 from llama_stack_client.types import SamplingParams, ResponseFormat
 from llama_stack_client.types.shared_params.agent_config import Toolgroup, ToolConfig
 from pydantic import BaseModel, model_validator
+from starlette.applications import Starlette
+from starlette.routing import Mount
+import uvicorn
 
 from common.server import A2AServer
 from common.types import AgentCard
-from demos.a2a_llama_stack.A2ATool import A2ATool
+from demos.a2a_llama_stack.A2ATool import A2ATool, DispatchLoop
+from demos.a2a_llama_stack.cli.card_resolver import AgentCardCache, fetch_agent_cards
 from demos.a2a_llama_stack.task_manager import AgentTaskManager
 
+# path under which a hosted fleet serves its agents
+FLEET_PATH_PREFIX = "/agents"
+
+
+def agent_path(agent_name: str) -> str:
+    """
+    Return the path prefix under which a hosted fleet serves an agent, e.g. /agents/orchestration-agent.
+    """
+    return f"{FLEET_PATH_PREFIX}/{re.sub(r'[^a-z0-9]+', '-', agent_name.lower()).strip('-')}"
+
 
 class LLSAgentConfiguration(BaseModel):
     tool_parser: Optional[ToolParser] = None,
@@ -65,10 +82,10 @@ class A2AFleetAgent:
         self.lls_agent = None
         self.a2a_server = None
 
-    def run_agent(self, client: LlamaStackClient):
-        if not self.spec.managed:
-            return
-
+    def build_server(self, client: LlamaStackClient) -> A2AServer:
+        """
+        Create the LLS agent and the A2A server wrapping it, without starting the server.
+        """
         self.lls_agent = Agent(client=client, **self.spec.lls_agent_config.dict())
 
         task_manager = AgentTaskManager(agent=self.lls_agent)
@@ -79,16 +96,53 @@ class A2AFleetAgent:
             host='localhost',
             port=parsed_url.port
         )
-        thread = threading.Thread(target=self.a2a_server.start, daemon=True)
+        return self.a2a_server
+
+    def run_agent(self, client: LlamaStackClient):
+        if not self.spec.managed:
+            return
+
+        thread = threading.Thread(target=self.build_server(client).start, daemon=True)
         thread.start()
 
 
 class A2AFleet:
     """
     A manager for a set of A2A-aware Llama Stack agents.
+
+    By default every managed agent runs its own A2A server, on the port of its URL. With host_url
+    (e.g. http://localhost:10000), the managed agents are hosted by a single server instead, each
+    under its own path (see agent_path), and their card URLs are rewritten to point there.
     """
-    def __init__(self, llama_stack_url: str, agent_specs: List[AgentSpecification]):
+    def __init__(self, llama_stack_url: str, agent_specs: List[AgentSpecification], card_cache: bool = True,
+                 host_url: Optional[str] = None):
         self.client = LlamaStackClient(base_url=llama_stack_url)
+        self.host_url = host_url.rstrip("/") if host_url else None
+        self.server = None
+
+        # resolve the cards of the agents given only by URL all at once, instead of one agent at a time
+        missing_card_urls = [spec.url for spec in agent_specs if spec.a2a_agent_card is None]
+        if missing_card_urls:
+            cache = AgentCardCache() if card_cache else None
+            # fetched on the dispatch loop with its client, whose connections the A2A tools then reuse
+            dispatch = DispatchLoop.get()
+            cards = dispatch.run(fetch_agent_cards(missing_card_urls, cache=cache, client=dispatch.http_client))
+            for spec in agent_specs:
+                if spec.a2a_agent_card is None:
+                    spec.a2a_agent_card = cards[spec.url]
+
+        if self.host_url:
+            # rewritten before the agents are created, so that their peers' A2A tools call the hosted paths
+            paths = set()
+            for spec in agent_specs:
+                if not spec.managed:
+                    continue
+                path = agent_path(spec.a2a_agent_card.name)
+                if path in paths:
+                    raise ValueError(f"Several managed agents would be served at {path}, give them distinct names.")
+                paths.add(path)
+                spec.url = f"{self.host_url}{path}/"
+                spec.a2a_agent_card = spec.a2a_agent_card.model_copy(update={"url": spec.url})
 
         self.agents = {}
         for spec in agent_specs:
@@ -100,12 +154,41 @@ class A2AFleet:
 
     def run_fleet(self):
         """
-        Initialize the managed Llama Stack servers and run each of them as a dedicated A2A server.
+        Initialize the managed Llama Stack agents, and run each of them as a dedicated A2A server,
+        or all of them in one server when the fleet has a host URL.
         """
-        for agent in self.agents.values():
-            agent.run_agent(self.client)
+        if self.host_url:
+            self._host_fleet()
+        else:
+            for agent in self.agents.values():
+                agent.run_agent(self.client)
         self.fleet_active = True
 
+    def fleet_app(self) -> Starlette:
+        """
+        Create a single ASGI app serving every managed agent under its own path, with its own agent card.
+        """
+        routes = [
+            Mount(agent_path(agent.spec.a2a_agent_card.name), app=agent.build_server(self.client).app)
+            for agent in self.agents.values() if agent.spec.managed
+        ]
+        return Starlette(routes=routes)
+
+    def _host_fleet(self):
+        """
+        Serve the fleet app on the A2A dispatch loop, so that the hosted agents and the A2A tools
+        calling them share one event loop and one HTTP connection pool.
+        """
+        parsed_url = urlparse(self.host_url)
+        config = uvicorn.Config(self.fleet_app(), host=parsed_url.hostname, port=parsed_url.port or 80)
+        self.server = uvicorn.Server(config)
+        serving = asyncio.run_coroutine_threadsafe(self.server.serve(), DispatchLoop.get().loop)
+        while not self.server.started:
+            if serving.done():
+                serving.result()
+                raise RuntimeError(f"The fleet server stopped while starting on {self.host_url}")
+            time.sleep(0.05)
+
     def query_agent(self, agent_id, **kwargs):
         """
         Send a query to a managed Llama Stack agent.
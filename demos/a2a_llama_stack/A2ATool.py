@@ -1,13 +1,69 @@
 import asyncio
+import json
 import threading
 from typing import Dict
 from uuid import uuid4
 
+import httpx
 from llama_stack_client.lib.agents.client_tool import ClientTool
 from llama_stack_client.types.tool_def_param import Parameter
 
-from common.client import A2ACardResolver, A2AClient
-from common.types import AgentCard, TextPart
+from common.client import A2ACardResolver
+from common.types import (
+    AgentCard, TextPart,
+    SendTaskRequest, SendTaskResponse,
+    A2AClientHTTPError, A2AClientJSONError,
+)
+
+REQUEST_TIMEOUT = 30.0
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+
+class DispatchLoop:
+    """
+    A long-lived event loop running in a daemon thread, shared by all the A2A tools of the process.
+    Every call is dispatched on this loop, so that its keep-alive connection pool is reused across calls.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="a2a-dispatch-loop", daemon=True)
+        self.thread.start()
+        self.http_client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT, limits=POOL_LIMITS)
+
+    @classmethod
+    def get(cls) -> "DispatchLoop":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def run(self, coro):
+        """
+        Run a coroutine on the dispatch loop and block until it completes.
+        """
+        if self._on_loop():
+            coro.close()
+            raise RuntimeError("Cannot block on the A2A dispatch loop from within the loop itself")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def run_async(self, coro):
+        """
+        Run a coroutine on the dispatch loop and await its result from any other loop.
+        """
+        if self._on_loop():
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
 
 
 class A2ATool(ClientTool):
@@ -21,7 +77,6 @@ class A2ATool(ClientTool):
             self.agent_card = A2ACardResolver(self.url).get_agent_card()
         else:
             self.agent_card = agent_card
-        self.client = A2AClient(agent_card=self.agent_card)
 
     def get_name(self) -> str:
         return self.agent_card.name
@@ -40,16 +95,9 @@ class A2ATool(ClientTool):
         }
 
     def run_impl(self, query: str):
-        # we should cover both the case where the method is called from non-async code, and when
-        # there is an active event loop (i.e., async code)
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # run_impl is called from non-async code
-            return asyncio.run(self.async_run_impl(query=query))
-        else:
-            # run_impl is called from async code
-            return self._execute_async_run_in_new_loop(query=query)
+        # the call is dispatched on the shared loop both from non-async code and when there is an active
+        # event loop (i.e., async code), so no thread or event loop is created per call
+        return DispatchLoop.get().run(self.async_run_impl(query=query))
 
     async def async_run_impl(self, **kwargs):
         message = {
@@ -69,25 +117,19 @@ class A2ATool(ClientTool):
             "message": message,
         }
 
-        response = await self.client.send_task(payload)
+        response = await DispatchLoop.get().run_async(self._send_task(payload))
         # TODO: add support for FilePart and DataPart
         text_response_parts = [p for p in response.result.status.message.parts if isinstance(p, TextPart)]
         return "\n".join([t.text for t in text_response_parts])
 
-    def _execute_async_run_in_new_loop(self, **kwargs):
-        result_container = {}
-        exception_container = {}
-
-        def thread_target():
-            try:
-                result_container['result'] = asyncio.run(self.async_run_impl(**kwargs))
-            except Exception as e:
-                exception_container['error'] = e
-
-        thread = threading.Thread(target=thread_target)
-        thread.start()
-        thread.join()
-
-        if 'error' in exception_container:
-            raise exception_container['error']
-        return result_container['result']
+    async def _send_task(self, payload: dict) -> SendTaskResponse:
+        # same request as A2AClient.send_task, but over the pooled client of the dispatch loop
+        request = SendTaskRequest(params=payload)
+        try:
+            response = await DispatchLoop.get().http_client.post(self.agent_card.url, json=request.model_dump())
+            response.raise_for_status()
+            return SendTaskResponse(**response.json())
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
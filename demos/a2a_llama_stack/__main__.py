@@ -1,19 +1,25 @@
 import os
+import json
 import logging
 import importlib
 import click
+import uvicorn
 
 from llama_stack_client import LlamaStackClient, Agent
 from common.server import A2AServer
 from common.types import AgentCard, AgentCapabilities, AgentSkill
+from .task_store import build_task_store
 
 logging.basicConfig(level=logging.INFO)
 
-def build_server(agent_name: str, host: str, port: int = None):
+# environment variable passing the CLI options to the worker processes
+SERVER_OPTIONS_ENV = "A2A_SERVER_OPTIONS"
+
+def load_agent_config(agent_name: str) -> dict:
     try:
         config_module_path = f"{__package__}.agents.{agent_name.replace('-', '_')}.config"
         config_module = importlib.import_module(config_module_path)
-        agent_config_data = config_module.AGENT_CONFIG
+        return config_module.AGENT_CONFIG
     except ModuleNotFoundError:
         logging.error(f"Configuration module not found for agent: {agent_name} at {config_module_path}")
         raise
@@ -21,6 +27,15 @@ def build_server(agent_name: str, host: str, port: int = None):
         logging.error(f"AGENT_CONFIG not found in {config_module_path}")
         raise
 
+def build_server(agent_name: str, host: str, port: int = None, task_store: dict = None,
+                 session_cache: bool = False):
+    """
+    Create the A2A server of an agent; task_store overrides the "task_store" entry of its AGENT_CONFIG.
+    With session_cache, each A2A session gets its own Llama Stack session instead of the single
+    internal one, as does an "internal_session_id": False entry of its "task_manager_params".
+    """
+    agent_config_data = load_agent_config(agent_name)
+
     if port is None:
         port = agent_config_data.get("default_port", 8000)
 
@@ -36,8 +51,16 @@ def build_server(agent_name: str, host: str, port: int = None):
         sampling_params=agent_params_config.get("sampling_params", None)
     )
 
+    task_manager_params = {"internal_session_id": True, **agent_config_data.get("task_manager_params", {})}
+    if session_cache:
+        task_manager_params["internal_session_id"] = False
+
     TaskManagerClass = agent_config_data["task_manager_class"]
-    task_manager = TaskManagerClass(agent=agent, internal_session_id=True)
+    task_manager = TaskManagerClass(
+        agent=agent,
+        task_store=build_task_store(task_store or agent_config_data.get("task_store")),
+        **task_manager_params
+    )
 
     card_params_config = agent_config_data["agent_card_params"]
     agent_skills = [AgentSkill(**skill_p) for skill_p in card_params_config.get("skills_params", [])]
@@ -61,25 +84,63 @@ def build_server(agent_name: str, host: str, port: int = None):
         port=port,
     )
 
+def sqlite_task_store(config: dict = None, path: str = None) -> dict:
+    """
+    Get the configuration of a sqlite task store at path, keeping the other settings of
+    the agent's "task_store" entry if it is already a sqlite store.
+    """
+    config = dict(config or {})
+    if config.get("type", "memory") != "sqlite":
+        config = {"type": "sqlite"}
+    if path:
+        config["path"] = path
+    return config
+
+def create_app():
+    """
+    Create the app of a worker process, from the options passed by main.
+    Each worker builds its own server, with its own Llama Stack client and task store connection.
+    """
+    options = json.loads(os.environ[SERVER_OPTIONS_ENV])
+    return build_server(**options).app
+
 @click.command()
 @click.option("--agent-name", required=True, help="The name of the agent to run (e.g., a2a_planner, a2a_custom_tools). Corresponds to the directory name.")
 @click.option("--host", default="0.0.0.0", help="Host to bind the server to.")
 @click.option("--port", type=int, default=None, help="Port to bind the server to (overrides agent's default).")
-def main(agent_name, host, port):
-    effective_port = port
-    if port is None:
-        try:
-            config_module_path = f"agents.a2a_llama_stack.agents.{agent_name.replace('-', '_')}.config"
-            config_module = importlib.import_module(config_module_path)
-            effective_port = config_module.AGENT_CONFIG.get("default_port", "config_default")
-        except Exception:
-            effective_port = "unknown_default"
+@click.option("--workers", default=1, help="Number of server processes sharing the port.")
+@click.option("--task-db", default=None, help="Path of the sqlite task store shared by the workers (default: the agent's, or <agent-name>_tasks.db).")
+@click.option("--session-cache", is_flag=True, help="Give each A2A session its own Llama Stack session instead of sharing one.")
+@click.option("--loop", type=click.Choice(["auto", "asyncio", "uvloop"]), default="auto", help="Event loop; auto uses uvloop when it is installed.")
+@click.option("--http", type=click.Choice(["auto", "h11", "httptools"]), default="auto", help="HTTP parser; auto uses httptools when it is installed.")
+def main(agent_name, host, port, workers, task_db, session_cache, loop, http):
+    agent_config_data = load_agent_config(agent_name)
+    effective_port = port if port is not None else agent_config_data.get("default_port", 8000)
+    logging.info(f"Attempting to start server for agent: {agent_name} on {host}:{effective_port}")
 
+    task_store_config = agent_config_data.get("task_store") or {}
+    if workers > 1:
+        # tasks/get may reach another worker than the one that ran the task, so the workers share a sqlite store
+        if task_store_config.get("type", "memory") != "sqlite" and not task_db:
+            task_db = f"{agent_name}_tasks.db"
+            logging.warning(f"Tasks of {agent_name} are kept in {task_db}, an in-memory store cannot be shared by workers")
+        options = {
+            "agent_name": agent_name,
+            "host": host,
+            "port": effective_port,
+            "task_store": sqlite_task_store(task_store_config, task_db),
+            "session_cache": session_cache,
+        }
+        os.environ[SERVER_OPTIONS_ENV] = json.dumps(options)
+        uvicorn.run(f"{__package__}.__main__:create_app", factory=True, host=host, port=effective_port,
+                    workers=workers, loop=loop, http=http)
+        return
 
-    logging.info(f"Attempting to start server for agent: {agent_name} on {host}:{effective_port}")
-    server = build_server(agent_name=agent_name, host=host, port=port)
-    server.start()
-    logging.info(f"Server for agent {agent_name} should be running.")
+    task_store = sqlite_task_store(task_store_config, task_db) if task_db else None
+    server = build_server(agent_name=agent_name, host=host, port=port, task_store=task_store,
+                          session_cache=session_cache)
+    uvicorn.run(server.app, host=host, port=effective_port, loop=loop, http=http)
+    logging.info(f"Server for agent {agent_name} stopped.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark of the per-call overhead of A2ATool.run_impl.
+
+A stub A2A agent answering instantly is started in-process, so the measured time is pure
+dispatch overhead. The legacy dispatch path (a new thread, event loop and A2AClient
+connection per call) is compared with the shared dispatch loop and connection pool.
+
+Run from the a2a-samples/samples/python directory:
+    python -m agents.a2a_llama_stack.benchmarks.a2a_tool_overhead --calls 200
+"""
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from uuid import uuid4
+
+import click
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from common.client import A2AClient
+from common.types import AgentCard, AgentCapabilities, TaskState
+from ..A2ATool import A2ATool
+
+
+async def _handle_task(request):
+    body = await request.json()
+    params = body["params"]
+    return JSONResponse({
+        "jsonrpc": "2.0",
+        "id": body["id"],
+        "result": {
+            "id": params["id"],
+            "sessionId": params.get("sessionId"),
+            "status": {
+                "state": TaskState.COMPLETED.value,
+                "message": {"role": "agent", "parts": [{"type": "text", "text": "pong"}]},
+            },
+        },
+    })
+
+
+def _start_stub_agent() -> AgentCard:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    app = Starlette(routes=[Route("/", _handle_task, methods=["POST"])])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    return AgentCard(
+        name="Stub Agent",
+        description="Answers every task with 'pong'",
+        url=f"http://127.0.0.1:{port}/",
+        version="0.1.0",
+        capabilities=AgentCapabilities(),
+        skills=[],
+    )
+
+
+def _legacy_call(card: AgentCard, query: str) -> str:
+    """
+    The dispatch path used before the shared loop: a new thread and event loop per call,
+    and a new A2AClient, hence a new HTTP connection, per request.
+    """
+    result = {}
+
+    def thread_target():
+        payload = {
+            "id": uuid4().hex,
+            "acceptedOutputModes": ["text"],
+            "message": {"role": "user", "parts": [{"type": "text", "text": query}]},
+        }
+        response = asyncio.run(A2AClient(agent_card=card).send_task(payload))
+        result["text"] = response.result.status.message.parts[0].text
+
+    thread = threading.Thread(target=thread_target)
+    thread.start()
+    thread.join()
+    return result["text"]
+
+
+def _measure(call, calls: int) -> dict:
+    call()  # warm-up
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p99_ms": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+@click.command()
+@click.option("--calls", default=200, show_default=True, help="Number of measured calls per dispatch path.")
+def main(calls: int):
+    card = _start_stub_agent()
+    tool = A2ATool(card.url, card)
+
+    results = {
+        "legacy (thread + loop per call)": _measure(lambda: _legacy_call(card, "ping"), calls),
+        "shared dispatch loop": _measure(lambda: tool.run_impl("ping"), calls),
+    }
+    for name, stats in results.items():
+        click.echo(
+            f"{name:<34} mean {stats['mean_ms']:7.3f} ms   p50 {stats['p50_ms']:7.3f} ms   p99 {stats['p99_ms']:7.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
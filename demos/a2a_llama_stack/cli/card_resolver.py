@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+AGENT_CARD_PATH = "/.well-known/agent.json"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "a2a_llama_stack", "agent_cards")
+DEFAULT_MAX_AGE = 300.0
+DEFAULT_TIMEOUT = 5.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class AgentCardCache:
+    """
+    On-disk cache of agent cards keyed by agent URL.
+    Each entry keeps the card with its ETag and expiry time, so that stale cards can be revalidated
+    with a conditional request instead of being downloaded again.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, default_max_age: float = DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir or os.getenv("A2A_CARD_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.default_max_age = default_max_age
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def store(self, url: str, card: Dict[str, Any], headers: httpx.Headers) -> None:
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return
+        if "no-cache" in cache_control:
+            max_age = 0.0
+        else:
+            match = _MAX_AGE_RE.search(cache_control)
+            max_age = float(match.group(1)) if match else self.default_max_age
+
+        entry = {"url": url, "card": card, "etag": headers.get("etag"), "expires_at": time.time() + max_age}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write to a temporary file first, so that concurrent readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(url))
+        except OSError as e:
+            logger.warning("Could not cache the agent card of %s: %s", url, e)
+
+
+async def fetch_agent_card(
+    client: httpx.AsyncClient,
+    url: str,
+    cache: Optional[AgentCardCache] = None,
+    timeout: float = DEFAULT_TIMEOUT
+) -> AgentCard:
+    """
+    Return the agent card served at url, from the cache while it is fresh.
+    A stale cached card is revalidated with its ETag, and is used as a fallback if the agent cannot be reached.
+    """
+    entry = cache.load(url) if cache else None
+    if entry and entry["expires_at"] > time.time():
+        return AgentCard(**entry["card"])
+
+    headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else {}
+    try:
+        response = await client.get(url.rstrip("/") + AGENT_CARD_PATH, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            cache.store(url, entry["card"], response.headers)
+            return AgentCard(**entry["card"])
+        response.raise_for_status()
+        card_data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        if entry:
+            logger.warning("Could not refresh the agent card of %s (%s), using the cached card", url, e)
+            return AgentCard(**entry["card"])
+        raise
+
+    card = AgentCard(**card_data)
+    if cache:
+        cache.store(url, card_data, response.headers)
+    return card
+
+
+async def fetch_agent_cards(
+    urls: List[str],
+    cache: Optional[AgentCardCache] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, AgentCard]:
+    """
+    Resolve the agent cards of all the given URLs concurrently, each fetch bounded by timeout seconds.
+    The cards are fetched with client, and its connection pool, if given, else with a client of their own.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    async with contextlib.AsyncExitStack() as stack:
+        if client is None:
+            client = await stack.enter_async_context(httpx.AsyncClient())
+        results = await asyncio.gather(
+            *(fetch_agent_card(client, url, cache, timeout) for url in unique_urls),
+            return_exceptions=True
+        )
+
+    failures = [f"{url}: {result!r}" for url, result in zip(unique_urls, results) if isinstance(result, BaseException)]
+    if failures:
+        raise RuntimeError("Could not resolve agent cards: " + "; ".join(failures))
+    return dict(zip(unique_urls, results))
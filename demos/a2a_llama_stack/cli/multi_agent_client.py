@@ -2,13 +2,15 @@
 import asyncio
 import json
 import logging
+import time
 import urllib.parse
 from uuid import uuid4
 from typing import Tuple, Dict, Any, Optional, List
 
 import asyncclick as click
 
-from common.client import A2AClient, A2ACardResolver
+from common.client import A2AClient
+from card_resolver import AgentCardCache, fetch_agent_cards, DEFAULT_TIMEOUT
 from hosts.cli.push_notification_listener import PushNotificationListener
 from common.utils.push_notification_auth import PushNotificationReceiverAuth
 
@@ -34,36 +36,50 @@ def _build_skill_meta(agent_manager: 'AgentManager') -> List[Dict[str, Any]]:
     return list(unique_skills.values())
 
 class AgentManager:
-    def __init__(self, urls: List[str]):
+    def __init__(self, urls: List[str], cards: Dict[str, Any]):
         if not urls:
             raise ValueError("URLs list cannot be empty for AgentManager")
 
-        self.orchestrator: AgentInfo = self._make_agent_info(urls[0])
+        self.orchestrator: AgentInfo = self._make_agent_info(urls[0], cards[urls[0]])
 
         self.skills: Dict[str, AgentInfo] = {}
         if len(urls) > 1:
             for skill_agent_url in urls[1:]:
-                agent_info_tuple = self._make_agent_info(skill_agent_url)
+                agent_info_tuple = self._make_agent_info(skill_agent_url, cards[skill_agent_url])
                 agent_card = agent_info_tuple[1]
                 if hasattr(agent_card, 'skills') and isinstance(agent_card.skills, list):
                     for skill_item in agent_card.skills:
                         self.skills[skill_item.id] = agent_info_tuple
 
+    @classmethod
+    async def resolve(cls, urls: List[str], cache: Optional[AgentCardCache] = None, timeout: float = DEFAULT_TIMEOUT) -> 'AgentManager':
+        """
+        Create the manager after fetching all the agent cards concurrently.
+        """
+        cards = await fetch_agent_cards(list(urls), cache=cache, timeout=timeout)
+        return cls(urls, cards)
+
     @staticmethod
-    def _make_agent_info(url: str) -> AgentInfo:
-        card: Any = A2ACardResolver(url).get_agent_card()
+    def _make_agent_info(url: str, card: Any) -> AgentInfo:
         client = A2AClient(agent_card=card)
         session_id = uuid4().hex
         return url, card, client, session_id
 
-async def _send_payload(client: A2AClient, card: Any, session_id: str, payload: Dict[str, Any], streaming: bool) -> str:
+async def _send_payload(client: A2AClient, card: Any, session_id: str, payload: Dict[str, Any], streaming: bool, echo: bool = True) -> str:
     response_text = ""
     if streaming:
         async for ev in client.send_task_streaming(payload):
-            part = ev.result.status.message.parts[0].text or ""
-            print(part, end="", flush=True)
-            response_text = part
-        print()
+            status = getattr(ev.result, "status", None)
+            if status is None:
+                # artifact events repeat the final status message
+                continue
+            part = status.message.parts[0].text or ""
+            if ev.result.final:
+                response_text = part.strip()
+            elif echo:
+                print(part, end="", flush=True)
+        if echo:
+            print()
     else:
         res = await client.send_task(payload)
         response_text = res.result.status.message.parts[0].text.strip()
@@ -76,7 +92,8 @@ async def _send_task_to_agent(
     input_text: str,
     push_enabled: bool,
     push_host: Optional[str],
-    push_port: Optional[int]
+    push_port: Optional[int],
+    echo: bool = True
 ) -> str:
     payload: Dict[str, Any] = {
         "id": uuid4().hex,
@@ -94,7 +111,122 @@ async def _send_task_to_agent(
         }
 
     streaming_capability = getattr(getattr(card, "capabilities", object()), "streaming", False)
-    return await _send_payload(client, card, session_id, payload, streaming_capability)
+    return await _send_payload(client, card, session_id, payload, streaming_capability, echo)
+
+
+def _plan_dependencies(plan: List[Dict[str, Any]]) -> Tuple[List[str], List[List[int]]]:
+    """
+    Resolve the optional `id`/`depends_on` keys of the plan steps into, for each step,
+    the indices of the steps it depends on. Steps without an `id` are named by their 1-based position.
+    Raises ValueError if the plan has duplicate ids, unknown dependencies or a dependency cycle.
+    """
+    step_ids = [str(step.get("id", i)) for i, step in enumerate(plan, 1)]
+    index_of = {}
+    for i, step_id in enumerate(step_ids):
+        if step_id in index_of:
+            raise ValueError(f"Plan has several steps with id {step_id}")
+        index_of[step_id] = i
+
+    dependencies: List[List[int]] = []
+    for i, step in enumerate(plan):
+        depends_on = step.get("depends_on") or []
+        if not isinstance(depends_on, list):
+            depends_on = [depends_on]
+        step_deps = []
+        for dep in depends_on:
+            dep_index = index_of.get(str(dep))
+            if dep_index is None:
+                raise ValueError(f"Step {step_ids[i]} depends on unknown step {dep}")
+            if dep_index == i:
+                raise ValueError(f"Step {step_ids[i]} depends on itself")
+            step_deps.append(dep_index)
+        dependencies.append(step_deps)
+
+    # reject cycles up front, so that execution cannot deadlock
+    state = [0] * len(plan)  # 0: unvisited, 1: in progress, 2: done
+
+    def visit(i: int):
+        if state[i] == 1:
+            raise ValueError(f"Plan has a dependency cycle through step {step_ids[i]}")
+        if state[i] == 0:
+            state[i] = 1
+            for dep_index in dependencies[i]:
+                visit(dep_index)
+            state[i] = 2
+
+    for i in range(len(plan)):
+        visit(i)
+    return step_ids, dependencies
+
+
+async def _execute_plan(
+    plan: List[Dict[str, Any]],
+    agent_manager: 'AgentManager',
+    call_agent,
+    max_concurrency: int
+) -> List[Dict[str, Any]]:
+    """
+    Execute the plan as a dependency graph: each step starts as soon as the steps it depends on
+    have finished, with at most max_concurrency steps running at once. A step whose dependencies
+    failed or were skipped is skipped as well. Each step runs in its own A2A session, derived from
+    its executor's, so that concurrent steps on one executor do not share a Llama Stack session.
+    Results are returned in plan order, each with the step's wall-clock time.
+    Raises ValueError, before running any step, if the plan is invalid.
+    """
+    step_ids, dependencies = _plan_dependencies(plan)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: List[Dict[str, Any]] = [{} for _ in plan]
+    finished = [asyncio.Event() for _ in plan]
+
+    async def run_step(i: int) -> None:
+        for dep_index in dependencies[i]:
+            await finished[dep_index].wait()
+
+        step_details = plan[i]
+        skill_id_to_execute = step_details.get("skill_id")
+        failed_deps = [step_ids[d] for d in dependencies[i] if "error" in results[d]]
+        if failed_deps:
+            click.secho(f"Step {step_ids[i]} skipped, step(s) {', '.join(failed_deps)} did not complete.", fg="red")
+            results[i] = {"skill_id": skill_id_to_execute, "output": None, "skipped": True,
+                          "error": f"Skipped, depends on unfinished step(s) {', '.join(failed_deps)}"}
+            return
+        skill_input_params_json = json.dumps(step_details.get("input", {}))
+        skill_invocation_text = f"{skill_id_to_execute}({skill_input_params_json})"
+        if dependencies[i]:
+            previous_outputs = {step_ids[d]: results[d].get("output") for d in dependencies[i]}
+            skill_invocation_text += f"\nOutputs of previous steps: {json.dumps(previous_outputs)}"
+
+        skill_agent_info_tuple = agent_manager.skills.get(skill_id_to_execute)
+        if not skill_agent_info_tuple:
+            click.secho(f"No executor for '{skill_id_to_execute}', skipping.", fg="red")
+            results[i] = {"skill_id": skill_id_to_execute, "output": None, "error": "Skill agent not found"}
+            return
+
+        _, skill_card, skill_client, executor_session_id = skill_agent_info_tuple
+        # the outputs a step needs are passed in its text, so it does not need the session of earlier steps
+        skill_session_id = f"{executor_session_id}-{step_ids[i]}"
+        async with semaphore:
+            click.echo(f"➡️ Step {step_ids[i]}: {skill_invocation_text}")
+            start = time.perf_counter()
+            try:
+                skill_output = await call_agent(skill_client, skill_card, skill_session_id, skill_invocation_text)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                click.secho(f"   ❌ Step {step_ids[i]} ({elapsed:.2f}s) failed: {e}", fg="red")
+                results[i] = {"skill_id": skill_id_to_execute, "output": None, "error": str(e), "elapsed_s": round(elapsed, 3)}
+                return
+            elapsed = time.perf_counter() - start
+        click.secho(f"   ✅ Step {step_ids[i]} ({elapsed:.2f}s) → {skill_output}", fg="green")
+        results[i] = {"skill_id": skill_id_to_execute, "output": skill_output, "elapsed_s": round(elapsed, 3)}
+
+    async def run_and_signal(i: int) -> None:
+        try:
+            await run_step(i)
+        finally:
+            finished[i].set()
+
+    await asyncio.gather(*(run_and_signal(i) for i in range(len(plan))))
+    return results
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.version_option(version="1.0.0")
@@ -102,7 +234,10 @@ async def _send_task_to_agent(
 @click.option("--history/--no-history", "cli_history", default=False, help="Show history after each step.")
 @click.option("--use-push-notifications/--no-push-notifications", "cli_use_push_notifications", default=False)
 @click.option("--push-notification-receiver", "cli_push_notification_receiver", default="http://localhost:5000", show_default=True)
-async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications: bool, cli_push_notification_receiver: str):
+@click.option("--max-concurrency", "cli_max_concurrency", default=4, show_default=True, type=click.IntRange(min=1), help="Maximum number of plan steps executed concurrently.")
+@click.option("--card-cache/--no-card-cache", "cli_card_cache", default=True, show_default=True, help="Cache agent cards on disk between runs.")
+@click.option("--card-timeout", "cli_card_timeout", default=DEFAULT_TIMEOUT, show_default=True, type=float, help="Timeout in seconds for fetching each agent card.")
+async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications: bool, cli_push_notification_receiver: str, cli_max_concurrency: int, cli_card_cache: bool, cli_card_timeout: float):
     if len(cli_urls) < 2:
         click.secho("Error: Provide at least orchestrator + executor URLs.", fg="red", err=True)
         raise click.Abort()
@@ -126,7 +261,13 @@ async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications
         PushNotificationListener(host=push_host_val, port=push_port_val, notification_receiver_auth=auth_handler).start()
         click.secho(f"Push notification listener started at http://{push_host_val}:{push_port_val}/notify", fg="blue")
 
-    agent_manager = AgentManager(cli_urls)
+    try:
+        agent_manager = await AgentManager.resolve(
+            cli_urls, cache=AgentCardCache() if cli_card_cache else None, timeout=cli_card_timeout
+        )
+    except RuntimeError as e:
+        click.secho(f"Error: {e}", fg="red", err=True)
+        raise click.Abort()
 
     orch_url, orch_card, orch_client, orch_session_id = agent_manager.orchestrator
 
@@ -157,6 +298,11 @@ async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications
         _call_agent_lambda = lambda current_client, current_card, current_session_id, text_input: _send_task_to_agent(
             current_client, current_card, current_session_id, text_input, cli_use_push_notifications, push_host_val, push_port_val
         )
+        # concurrent steps would interleave their streamed output, so it is only echoed when steps run one at a time
+        _call_step_lambda = lambda current_client, current_card, current_session_id, text_input: _send_task_to_agent(
+            current_client, current_card, current_session_id, text_input, cli_use_push_notifications, push_host_val, push_port_val,
+            echo=cli_max_concurrency == 1
+        )
 
         click.secho("\n=========== 🧠 Planning Phase ===========", fg="yellow")
 
@@ -170,6 +316,12 @@ async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications
             "[\n"
             "  {\"skill_id\": \"tool_1\"},\n"
             "  {\"skill_id\": \"tool_2\"}\n"
+            "]\n"
+            "Steps are independent and run in parallel. Only if a step needs the output of other steps, "
+            "give the steps an `id` and list the ids it needs in `depends_on`, for example:\n"
+            "[\n"
+            "  {\"id\": \"a\", \"skill_id\": \"tool_1\"},\n"
+            "  {\"id\": \"b\", \"skill_id\": \"tool_2\", \"depends_on\": [\"a\"]}\n"
             "]"
         )
         combined_planner_input = plan_instructions + "\n\nUser question: " + question
@@ -198,26 +350,15 @@ async def cli(cli_urls: List[str], cli_history: bool, cli_use_push_notifications
         click.secho(f"\nFinal plan ➡️ {json.dumps(plan, indent=2)}", fg="green")
 
         click.secho("\n=========== ⚡️ Execution Phase ===========", fg="yellow")
-        execution_results = []
-        for i, step_details in enumerate(plan, 1):
-            skill_id_to_execute = step_details.get("skill_id")
-            skill_input_params_json = json.dumps(step_details.get("input", {}))
-            skill_invocation_text = f"{skill_id_to_execute}({skill_input_params_json})"
-
-            click.echo(f"➡️ Step {i}: {skill_invocation_text}")
-
-            skill_agent_info_tuple = agent_manager.skills.get(skill_id_to_execute)
-
-            if not skill_agent_info_tuple:
-                click.secho(f"No executor for '{skill_id_to_execute}', skipping.", fg="red")
-                execution_results.append({"skill_id": skill_id_to_execute, "output": None, "error": "Skill agent not found"})
-                continue
-
-            _, skill_card, skill_client, skill_session_id = skill_agent_info_tuple
-
-            skill_output = await _call_agent_lambda(skill_client, skill_card, skill_session_id, skill_invocation_text)
-            click.secho(f"   ✅ → {skill_output}", fg="green")
-            execution_results.append({"skill_id": skill_id_to_execute, "output": skill_output})
+        execution_start = time.perf_counter()
+        try:
+            step_results = await _execute_plan(plan, agent_manager, _call_step_lambda, cli_max_concurrency)
+        except ValueError as e:
+            click.secho(f"{e}. Skipping execution.", fg="red", err=True)
+            continue
+        click.echo(f"Executed {len(plan)} step(s) in {time.perf_counter() - execution_start:.2f}s")
+        # step timings are for display only and are left out of the composition prompt
+        execution_results = [{k: v for k, v in r.items() if k != "elapsed_s"} for r in step_results]
 
         click.secho("\n=========== 🛠️ Composing Answer ===========", fg="yellow")
 
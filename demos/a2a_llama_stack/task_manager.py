@@ -1,5 +1,10 @@
+import asyncio
 import logging
-from typing import AsyncIterable, Union, AsyncIterator
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Callable, Union, AsyncIterator, Iterator
 
 from llama_stack_client import Agent, AgentEventLogger
 
@@ -7,26 +12,172 @@ import common.server.utils as utils
 from common.server.task_manager import InMemoryTaskManager
 from common.types import (
     SendTaskRequest, SendTaskResponse,
+    GetTaskRequest, GetTaskResponse, TaskNotFoundError,
     SendTaskStreamingRequest, SendTaskStreamingResponse,
+    Task, TaskSendParams,
     TaskStatus, Artifact,
     Message, TaskState,
     TaskStatusUpdateEvent, TaskArtifactUpdateEvent,
-    JSONRPCResponse,
+    JSONRPCResponse, JSONRPCError,
 )
+from .task_store import TaskStore, InMemoryTaskStore
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_CONTENT_TYPES = ["text", "text/plain", "application/json"]
 
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_SESSION_CACHE_SIZE = 1024
+DEFAULT_SESSION_TTL = 3600.0
+
+
+class ServerBusyError(JSONRPCError):
+    code: int = -32000
+    message: str = "Agent is at capacity, retry later"
+    data: Any | None = None
+
+
+class SessionCache:
+    """
+    Maps A2A session ids to Llama Stack session ids.
+    Entries idle for longer than ttl seconds expire, and the least recently used
+    entries are evicted once the cache holds more than max_size sessions.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_SESSION_CACHE_SIZE, ttl: float = DEFAULT_SESSION_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._sessions: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(self, key: str, create: Callable[[str], str]) -> str:
+        """
+        Return the session mapped to key, calling create(key) to open a new one on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self._sessions[key] = (entry[0], now)
+                self._sessions.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # sessions are created outside the lock so that a slow round trip does not stall other turns
+        session_id = create(key)
+        with self._lock:
+            self._sessions[key] = (session_id, now)
+            self._sessions.move_to_end(key)
+            self._evict(now)
+        return session_id
+
+    def _evict(self, now: float):
+        # entries are ordered by last use, so expired ones are always at the front
+        while self._sessions:
+            oldest_key, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl and len(self._sessions) <= self.max_size:
+                break
+            del self._sessions[oldest_key]
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._sessions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
 
 class AgentTaskManager(InMemoryTaskManager):
-    def __init__(self, agent: Agent, internal_session_id=False):
+    def __init__(
+        self,
+        agent: Agent,
+        internal_session_id=False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        session_cache_size: int = DEFAULT_SESSION_CACHE_SIZE,
+        session_ttl: float = DEFAULT_SESSION_TTL,
+        task_store: TaskStore | None = None,
+    ):
         super().__init__()
+        # the store replaces the unbounded task dict of InMemoryTaskManager
+        self.tasks = task_store if task_store is not None else InMemoryTaskStore()
         self.agent = agent
         if internal_session_id:
             self.session_id = self.agent.create_session("custom-agent-session")
         else:
             self.session_id = None
+        # without an internal session, each A2A session gets its own Llama Stack session, reused across turns
+        self.session_cache = SessionCache(max_size=session_cache_size, ttl=session_ttl)
+
+        # Agent turns are blocking calls, so they run on a bounded pool instead of the event loop.
+        # At most max_workers turns run at once and max_queue more may wait for a free worker.
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-turn")
+        self._slots_lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+
+    def stats(self) -> dict:
+        """
+        Report the current load of the turn executor.
+        """
+        with self._slots_lock:
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": self._pending - self._in_flight,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+
+    def _at_capacity(self) -> bool:
+        with self._slots_lock:
+            return self._pending >= self.max_workers + self.max_queue
+
+    def _reserve_slot(self) -> bool:
+        with self._slots_lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                return False
+            self._pending += 1
+            return True
+
+    def _release_slot(self, *_):
+        with self._slots_lock:
+            self._pending -= 1
+
+    def _run_tracked(self, fn, *args):
+        with self._slots_lock:
+            self._in_flight += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._slots_lock:
+                self._in_flight -= 1
+
+    async def _run_turn(self, fn, *args):
+        """
+        Run a blocking call on the turn executor. The caller must hold a slot from _reserve_slot,
+        which is released once the call finishes (or is cancelled before it starts).
+        """
+        try:
+            future = self.executor.submit(self._run_tracked, fn, *args)
+        except BaseException:
+            self._release_slot()
+            raise
+        future.add_done_callback(self._release_slot)
+        return await asyncio.wrap_future(future)
+
+    def _busy_error(self, request_id) -> JSONRPCResponse:
+        logger.warning("Rejecting request %s, turn executor saturated: %s", request_id, self.stats())
+        return JSONRPCResponse(id=request_id, error=ServerBusyError(data=self.stats()))
 
     def _validate_request(
         self, request: Union[SendTaskRequest, SendTaskStreamingRequest]
@@ -45,22 +196,41 @@ class AgentTaskManager(InMemoryTaskManager):
         if err:
             return err
 
-        await self.upsert_task(request.params)
-        result = self._invoke(
-            request.params.message.parts[0].text,
-            request.params.sessionId
-        )
+        if not self._reserve_slot():
+            return self._busy_error(request.id)
+        try:
+            await self.upsert_task(request.params)
+        except BaseException:
+            self._release_slot()
+            raise
+        try:
+            result = await self._run_turn(
+                self._invoke,
+                request.params.message.parts[0].text,
+                request.params.sessionId
+            )
+        except Exception as e:
+            logger.exception("Turn of task %s failed", request.params.id)
+            task = await self._update_store(request.params.id, self._failed_status(e), [])
+            return SendTaskResponse(id=request.id, result=task)
         parts = [{"type": "text", "text": result}]
         status = TaskStatus(state=TaskState.COMPLETED, message=Message(role="agent", parts=parts))
         task = await self._update_store(request.params.id, status, [Artifact(parts=parts)])
         return SendTaskResponse(id=request.id, result=task)
 
+    @staticmethod
+    def _failed_status(error: Exception | str) -> TaskStatus:
+        parts = [{"type": "text", "text": f"Agent turn failed: {error}"}]
+        return TaskStatus(state=TaskState.FAILED, message=Message(role="agent", parts=parts))
+
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
     ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
         err = self._validate_request(request)
         if err:
             return err
+        if self._at_capacity():
+            return self._busy_error(request.id)
 
         await self.upsert_task(request.params)
         return self._stream_generator(request)
@@ -71,7 +241,31 @@ class AgentTaskManager(InMemoryTaskManager):
         params = request.params
         query = params.message.parts[0].text
 
-        async for update in self._stream(query, params.sessionId):
+        if not self._reserve_slot():
+            # the executor filled up since on_send_task_subscribe checked it: the stored task is
+            # marked failed rather than left SUBMITTED forever
+            await self._update_store(params.id, self._failed_status(ServerBusyError().message), [])
+            yield SendTaskStreamingResponse(id=request.id, error=ServerBusyError(data=self.stats()))
+            return
+
+        working = False
+        updates = self._stream(query, params.sessionId)
+        while True:
+            try:
+                update = await updates.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                # the subscriber gets a final FAILED status instead of a broken stream
+                logger.exception("Turn of task %s failed", params.id)
+                status = self._failed_status(e)
+                await self._update_store(params.id, status, [])
+                yield SendTaskStreamingResponse(
+                    id=request.id,
+                    result=TaskStatusUpdateEvent(id=params.id, status=status, final=True)
+                )
+                return
+
             done = update["is_task_complete"]
             content = update["content"]
             delta = update["updates"]
@@ -82,7 +276,10 @@ class AgentTaskManager(InMemoryTaskManager):
             artifacts = [Artifact(parts=parts)] if done else None
 
             status = TaskStatus(state=state, message=Message(role="agent", parts=parts))
-            await self._update_store(request.params.id, status, artifacts or [])
+            # Deltas are only meaningful to the subscriber, so the store is written on state changes only
+            if done or not working:
+                await self._update_store(request.params.id, status, artifacts or [])
+                working = True
 
             yield SendTaskStreamingResponse(
                 id=request.id,
@@ -94,41 +291,103 @@ class AgentTaskManager(InMemoryTaskManager):
                     result=TaskArtifactUpdateEvent(id=params.id, artifact=artifacts[0])
                 )
 
+    async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
+        # the store is read with aget, which does not block the event loop
+        task = await self.tasks.aget(request.params.id)
+        if task is None:
+            return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+        return GetTaskResponse(id=request.id, result=self.append_task_history(task, request.params.historyLength))
+
+    async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
+        def apply(task: Task | None) -> Task:
+            if task is None:
+                return Task(
+                    id=task_send_params.id,
+                    sessionId=task_send_params.sessionId,
+                    status=TaskStatus(state=TaskState.SUBMITTED),
+                    history=[task_send_params.message],
+                )
+            task.history = (task.history or []) + [task_send_params.message]
+            return task
+
+        return await self.tasks.update(task_send_params.id, apply)
+
     async def _update_store(self, task_id: str, status: TaskStatus, artifacts):
-        async with self.lock:
-            task = self.tasks[task_id]
+        def apply(task: Task | None) -> Task:
+            if task is None:
+                raise KeyError(task_id)
             task.status = status
             if artifacts:
                 task.artifacts = (task.artifacts or []) + artifacts
             return task
 
-    def _invoke(self, query: str, session_id: str) -> str:
+        return await self.tasks.update(task_id, apply)
+
+    def _turn_chunks(self, query: str, session_id: str) -> Iterator[str]:
         """
-        Route the user query through the Agent, executing tools as needed.
+        Route the user query through the Agent, executing tools as needed,
+        and yield the tool and LLM outputs as they arrive.
         """
         # Determine which session to use
         if self.session_id is not None:
             sid = self.session_id
-        else:
+        elif session_id is None:
             sid = self.agent.create_session(session_id)
+        else:
+            sid = self.session_cache.get_or_create(session_id, self.agent.create_session)
 
         # Send the user query to the Agent
         turn_resp = self.agent.create_turn(
             messages=[{"role": "user", "content": query}],
             session_id=sid,
+            stream=True,
         )
 
         # Extract tool and LLM outputs from events
-        logs = AgentEventLogger().log(turn_resp)
-        output = ""
-        for event in logs:
+        for event in AgentEventLogger().log(turn_resp):
             if hasattr(event, "content") and event.content:
-                output += event.content
-        return output
+                yield event.content
+
+    def _invoke(self, query: str, session_id: str) -> str:
+        """
+        Route the user query through the Agent and return the complete output.
+        """
+        return "".join(self._turn_chunks(query, session_id))
 
     async def _stream(self, query: str, session_id: str) -> AsyncIterator[dict]:
         """
-        Simplest streaming stub: synchronously invoke and emit once.
+        Run the turn on the turn executor and emit each output chunk as soon as it arrives.
+        The caller must hold a slot from _reserve_slot.
         """
-        result = self._invoke(query, session_id)
-        yield {"updates": result, "is_task_complete": True, "content": result}
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        end_of_turn = object()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for chunk in self._turn_chunks(query, session_id):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            finally:
+                if not stop.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, end_of_turn)
+
+        turn = asyncio.ensure_future(self._run_turn(produce))
+        chunks = []
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is end_of_turn:
+                    break
+                chunks.append(chunk)
+                yield {"updates": chunk, "is_task_complete": False, "content": None}
+            # surface any error raised by the turn
+            await turn
+        finally:
+            # the subscriber may go away mid-turn, in which case the worker stops consuming the stream
+            stop.set()
+
+        content = "".join(chunks)
+        yield {"updates": "", "is_task_complete": True, "content": content}
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from common.types import Message, Task, TaskState, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+
+DEFAULT_MAX_TASKS = 10000
+DEFAULT_MAX_ARTIFACTS = 16
+DEFAULT_MAX_HISTORY = 64
+DEFAULT_COMPLETED_TTL = 24 * 3600.0
+DEFAULT_STALE_TTL = 3600.0
+
+
+class TaskStore(ABC):
+    """
+    Base class for the task stores used by AgentTaskManager.
+    A store behaves like the task dict of InMemoryTaskManager, so a task that was
+    modified must be written back with store[task_id] = task to be persisted.
+    Changes made from the event loop should go through update, which is atomic and
+    does not block the loop.
+    """
+
+    def __init__(self, max_artifacts: int = DEFAULT_MAX_ARTIFACTS, max_history: int = DEFAULT_MAX_HISTORY):
+        self.max_artifacts = max_artifacts
+        self.max_history = max_history
+
+    async def aget(self, task_id: str) -> Optional[Task]:
+        """
+        Return a task, or None if there is none, without blocking the event loop.
+        """
+        return self.get(task_id)
+
+    async def update(self, task_id: str, apply: Callable[[Optional[Task]], Task]) -> Task:
+        """
+        Read a task, change it and write it back as one atomic step. apply gets the stored
+        task, or None if there is none, and returns the task to store; an exception raised
+        by apply (e.g. a KeyError for a missing task) leaves the store unchanged.
+        """
+        # nothing awaits between the read and the write, so no other update can interleave
+        task = apply(self.get(task_id))
+        self[task_id] = task
+        return task
+
+    def _trim(self, task: Task) -> Task:
+        # only the most recent artifacts and messages are kept, so a long-lived task stays bounded
+        if task.artifacts and len(task.artifacts) > self.max_artifacts:
+            task.artifacts = task.artifacts[-self.max_artifacts:]
+        if task.history and len(task.history) > self.max_history:
+            task.history = task.history[-self.max_history:]
+        return task
+
+    @abstractmethod
+    def get(self, task_id: str, default: Optional[Task] = None) -> Optional[Task]:
+        ...
+
+    @abstractmethod
+    def __setitem__(self, task_id: str, task: Task):
+        ...
+
+    @abstractmethod
+    def _delete(self, task_id: str):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __delitem__(self, task_id: str):
+        self._delete(task_id)
+
+    def __getitem__(self, task_id: str) -> Task:
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+
+class InMemoryTaskStore(TaskStore):
+    """
+    Keeps up to max_tasks tasks in memory, evicting the least recently used
+    finished tasks first.
+    """
+
+    def __init__(self, max_tasks: int = DEFAULT_MAX_TASKS, **kwargs):
+        super().__init__(**kwargs)
+        self.max_tasks = max_tasks
+        self._tasks: OrderedDict[str, Task] = OrderedDict()
+
+    def get(self, task_id: str, default: Optional[Task] = None) -> Optional[Task]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return default
+        self._tasks.move_to_end(task_id)
+        return task
+
+    def __setitem__(self, task_id: str, task: Task):
+        self._tasks[task_id] = self._trim(task)
+        self._tasks.move_to_end(task_id)
+        while len(self._tasks) > self.max_tasks:
+            self._evict_one()
+
+    def _delete(self, task_id: str):
+        del self._tasks[task_id]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def _evict_one(self):
+        victim = next(
+            (task_id for task_id, task in self._tasks.items() if task.status.state in TERMINAL_STATES),
+            None
+        )
+        if victim is None:
+            victim = next(iter(self._tasks))
+            logger.warning("Task store full of unfinished tasks, evicting task %s", victim)
+        del self[victim]
+
+
+class SqliteTaskStore(TaskStore):
+    """
+    Persists tasks in a sqlite database in WAL mode, so that task history survives
+    restarts and can be shared by several server processes.
+    Finished tasks are deleted completed_ttl seconds after their last update. Unfinished
+    tasks not updated for stale_ttl seconds, e.g. left behind by a server that stopped
+    mid-turn, are marked failed, and deleted like the other finished tasks.
+    The async methods run the queries on a worker thread, and update reads and writes a
+    task in one transaction, so that concurrent updates from several processes do not
+    overwrite each other.
+    """
+
+    EXPIRY_INTERVAL = 60.0
+
+    def __init__(self, path: str = "a2a_tasks.db", completed_ttl: float = DEFAULT_COMPLETED_TTL,
+                 stale_ttl: float = DEFAULT_STALE_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.completed_ttl = completed_ttl
+        self.stale_ttl = stale_ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn_lock = threading.Lock()
+        with self._conn_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_by_state ON tasks (state, updated_at)")
+        self._last_expiry = 0.0
+
+    def get(self, task_id: str, default: Optional[Task] = None) -> Optional[Task]:
+        with self._conn_lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return default
+        return Task.model_validate_json(row[0])
+
+    async def aget(self, task_id: str) -> Optional[Task]:
+        return await asyncio.to_thread(self.get, task_id)
+
+    def __setitem__(self, task_id: str, task: Task):
+        now = time.time()
+        with self._conn_lock:
+            self._write(task_id, task, now)
+        self._maybe_expire(now)
+
+    async def update(self, task_id: str, apply: Callable[[Optional[Task]], Task]) -> Task:
+        return await asyncio.to_thread(self._update, task_id, apply)
+
+    def _update(self, task_id: str, apply: Callable[[Optional[Task]], Task]) -> Task:
+        now = time.time()
+        with self._conn_lock:
+            # the write lock is taken before the read, so no other process can update the task in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+                task = apply(Task.model_validate_json(row[0]) if row is not None else None)
+                self._write(task_id, task, now)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        self._maybe_expire(now)
+        return task
+
+    def _write(self, task_id: str, task: Task, now: float):
+        # the caller holds _conn_lock
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tasks (id, state, updated_at, data) VALUES (?, ?, ?, ?)",
+            (task_id, task.status.state.value, now, self._trim(task).model_dump_json())
+        )
+
+    def _maybe_expire(self, now: float):
+        if now - self._last_expiry > self.EXPIRY_INTERVAL:
+            self.expire(now)
+
+    def _delete(self, task_id: str):
+        with self._conn_lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def __len__(self) -> int:
+        with self._conn_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Delete the finished tasks that have not been updated for completed_ttl seconds,
+        and mark failed the unfinished ones that have not been updated for stale_ttl seconds.
+        """
+        now = time.time() if now is None else now
+        self._last_expiry = now
+        states = [state.value for state in TERMINAL_STATES]
+        placeholders = ", ".join("?" for _ in states)
+        with self._conn_lock:
+            expired = [row[0] for row in self._conn.execute(
+                f"SELECT id FROM tasks WHERE state IN ({placeholders}) AND updated_at < ?",
+                (*states, now - self.completed_ttl)
+            )]
+            if expired:
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in expired])
+            stale = self._conn.execute(
+                f"SELECT id, updated_at, data FROM tasks WHERE state NOT IN ({placeholders}) AND updated_at < ?",
+                (*states, now - self.stale_ttl)
+            ).fetchall()
+            for task_id, updated_at, data in stale:
+                task = Task.model_validate_json(data)
+                task.status = TaskStatus(
+                    state=TaskState.FAILED,
+                    message=Message(role="agent", parts=[{"type": "text", "text": "Task abandoned, no update received"}])
+                )
+                # the condition on updated_at leaves alone a task another worker updated in the meantime
+                self._conn.execute(
+                    "UPDATE tasks SET state = ?, updated_at = ?, data = ? WHERE id = ? AND updated_at = ?",
+                    (TaskState.FAILED.value, now, task.model_dump_json(), task_id, updated_at)
+                )
+        if expired:
+            logger.info("Expired %d finished tasks from %s", len(expired), self.path)
+        if stale:
+            logger.warning("Marked %d stale unfinished tasks failed in %s", len(stale), self.path)
+        return len(expired)
+
+    def close(self):
+        with self._conn_lock:
+            self._conn.close()
+
+
+def build_task_store(config: Optional[dict] = None) -> TaskStore:
+    """
+    Create a task store from the "task_store" entry of an AGENT_CONFIG, e.g.
+    {"type": "sqlite", "path": "/data/tasks.db", "completed_ttl": 3600}.
+    """
+    params = dict(config or {})
+    store_type = params.pop("type", "memory")
+    if store_type == "memory":
+        return InMemoryTaskStore(**params)
+    if store_type == "sqlite":
+        return SqliteTaskStore(**params)
+    raise ValueError(f"Unknown task store type: {store_type}")
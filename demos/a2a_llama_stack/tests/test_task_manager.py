@@ -0,0 +1,76 @@
+"""
+Run from the a2a-samples/samples/python directory:
+    python -m pytest agents/a2a_llama_stack/tests
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("common")
+pytest.importorskip("llama_stack_client")
+
+from common.types import SendTaskRequest, SendTaskStreamingRequest, TaskState  # noqa: E402
+from agents.a2a_llama_stack.task_manager import AgentTaskManager  # noqa: E402
+
+
+class FailingAgent:
+    """An agent whose turns always raise."""
+
+    def create_session(self, name):
+        return "session"
+
+    def create_turn(self, **kwargs):
+        raise RuntimeError("model unavailable")
+
+
+def _params(task_id):
+    return {
+        "id": task_id,
+        "sessionId": "a2a-session",
+        "acceptedOutputModes": ["text"],
+        "message": {"role": "user", "parts": [{"type": "text", "text": "hello"}]},
+    }
+
+
+def test_failed_turn_marks_task_failed():
+    manager = AgentTaskManager(agent=FailingAgent())
+    request = SendTaskRequest(id=1, params=_params("task-1"))
+
+    response = asyncio.run(manager.on_send_task(request))
+
+    assert response.error is None
+    assert response.result.status.state == TaskState.FAILED
+    assert "model unavailable" in response.result.status.message.parts[0].text
+    assert manager.tasks["task-1"].status.state == TaskState.FAILED
+    assert manager.stats()["in_flight"] == 0
+
+
+def test_failed_streaming_turn_ends_with_failed_status():
+    manager = AgentTaskManager(agent=FailingAgent())
+    request = SendTaskStreamingRequest(id=1, params=_params("task-2"))
+
+    async def collect():
+        stream = await manager.on_send_task_subscribe(request)
+        return [event async for event in stream]
+
+    events = asyncio.run(collect())
+
+    assert events[-1].result.final
+    assert events[-1].result.status.state == TaskState.FAILED
+    assert manager.tasks["task-2"].status.state == TaskState.FAILED
+
+
+def test_streaming_task_rejected_when_busy_is_marked_failed():
+    manager = AgentTaskManager(agent=FailingAgent(), max_workers=1, max_queue=0)
+    request = SendTaskStreamingRequest(id=1, params=_params("task-3"))
+
+    async def collect():
+        stream = await manager.on_send_task_subscribe(request)
+        # another turn takes the last slot before the stream starts
+        assert manager._reserve_slot()
+        return [event async for event in stream]
+
+    events = asyncio.run(collect())
+
+    assert events[-1].error.code == -32000
+    assert manager.tasks["task-3"].status.state == TaskState.FAILED
@@ -0,0 +1,68 @@
+"""
+Run from the a2a-samples/samples/python directory:
+    python -m pytest agents/a2a_llama_stack/tests
+"""
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("common")
+
+from common.types import Message, Task, TaskState, TaskStatus  # noqa: E402
+from agents.a2a_llama_stack.task_store import InMemoryTaskStore, SqliteTaskStore  # noqa: E402
+
+
+def _message(text):
+    return Message(role="user", parts=[{"type": "text", "text": text}])
+
+
+def _append(text):
+    def apply(task):
+        if task is None:
+            return Task(id="task", sessionId="s", status=TaskStatus(state=TaskState.SUBMITTED), history=[_message(text)])
+        task.history = task.history + [_message(text)]
+        return task
+    return apply
+
+
+def _missing(task):
+    if task is None:
+        raise KeyError("task")
+    return task
+
+
+def test_update_of_missing_task_leaves_memory_store_unchanged():
+    store = InMemoryTaskStore()
+
+    with pytest.raises(KeyError):
+        asyncio.run(store.update("task", _missing))
+
+    assert len(store) == 0
+
+
+def test_update_of_missing_task_leaves_sqlite_store_unchanged(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / "tasks.db"))
+
+    with pytest.raises(KeyError):
+        asyncio.run(store.update("task", _missing))
+
+    assert len(store) == 0
+
+
+def test_concurrent_sqlite_updates_are_not_lost(tmp_path):
+    # two stores on one database stand for two server processes
+    path = str(tmp_path / "tasks.db")
+    stores = [SqliteTaskStore(path, max_history=1000), SqliteTaskStore(path, max_history=1000)]
+
+    def run(store, worker):
+        for i in range(50):
+            store._update("task", _append(f"{worker}-{i}"))
+
+    threads = [threading.Thread(target=run, args=(store, n)) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(asyncio.run(stores[0].aget("task")).history) == 100
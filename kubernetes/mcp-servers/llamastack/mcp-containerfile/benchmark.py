@@ -0,0 +1,219 @@
+"""
+Benchmark of the MCP server over the stdio and SSE transports: list_tools and call_tool throughput and latency.
+
+mcp_server.py is started against a mock of the upstream API (mock_upstream.py), driven with the MCP
+client, and the results are written as a JSON report. Given the report of a previous run, the benchmark
+fails when throughput or p99 latency regressed by more than --max-regression. It also fails when tool
+calls failed, as their timings would not measure the server.
+
+    python benchmark.py ./openapi.json --transport stdio --transport sse --calls 2000 --report report.json
+    python benchmark.py ./openapi.json --baseline report.json --max-regression 0.2
+"""
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+from mcp_server import TOOL_ERROR_PREFIX
+from mock_upstream import free_port, start_mock_upstream, stop_process, wait_until_listening
+
+REPORT_VERSION = 1
+
+
+def _summary(latencies: List[float], elapsed: float, errors: int) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "per_s": len(latencies) / elapsed if elapsed else None,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else None,
+    }
+
+
+def _failed(result: Any) -> bool:
+    # servers that predate isError only flagged failed calls by the text of the result
+    return result.isError or any(
+        getattr(content, "text", "").startswith(TOOL_ERROR_PREFIX) for content in result.content
+    )
+
+
+def _describe(stats: Dict[str, Any]) -> str:
+    if not stats["count"]:
+        return f"no successful call   errors {stats['errors']}"
+    return (f"{stats['per_s']:8.1f}/s   p50 {stats['p50_ms']:7.2f} ms   "
+            f"p99 {stats['p99_ms']:7.2f} ms   errors {stats['errors']}")
+
+
+async def _measure(session: ClientSession, tools: Tuple[str, ...], list_calls: int, calls: int,
+                   concurrency: int) -> Dict[str, Any]:
+    """Time list_tools calls one at a time, then tool calls (round robin over tools) from concurrency tasks."""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(list_calls):
+        call_start = time.perf_counter()
+        await session.list_tools()
+        latencies.append(time.perf_counter() - call_start)
+    list_tools = _summary(latencies, time.perf_counter() - start, 0)
+
+    latencies = []
+    errors = 0
+    pending = iter(range(calls))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            call_start = time.perf_counter()
+            try:
+                result = await session.call_tool(tools[i % len(tools)], {})
+            except Exception:
+                errors += 1
+                continue
+            if _failed(result):
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - call_start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"list_tools": list_tools, "call_tool": _summary(latencies, time.perf_counter() - start, errors)}
+
+
+async def _run_stdio(server_command: List[str], measure) -> Dict[str, Any]:
+    params = StdioServerParameters(command=server_command[0], args=server_command[1:])
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                return await measure(session)
+
+
+async def _run_sse(url: str, measure) -> Dict[str, Any]:
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            return await measure(session)
+
+
+def _run_transport(transport: str, server_command: List[str], measure) -> Dict[str, Any]:
+    if transport == "stdio":
+        return asyncio.run(_run_stdio(server_command, measure))
+
+    port = free_port()
+    server = subprocess.Popen(
+        [*server_command, "--transport", "sse", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_listening(port)
+        return asyncio.run(_run_sse(f"http://127.0.0.1:{port}/sse", measure))
+    finally:
+        stop_process(server)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """List the measurements of report that regressed by more than max_regression (a fraction) from baseline."""
+    regressions = []
+    for transport, phases in report["results"].items():
+        for phase, stats in phases.items():
+            base = baseline.get("results", {}).get(transport, {}).get(phase)
+            if not base:
+                continue
+            if base["per_s"] and stats["per_s"] is not None and stats["per_s"] < base["per_s"] * (1 - max_regression):
+                regressions.append(f"{transport} {phase}: {stats['per_s']:.1f}/s, baseline {base['per_s']:.1f}/s")
+            if base["p99_ms"] and stats["p99_ms"] is not None and stats["p99_ms"] > base["p99_ms"] * (1 + max_regression):
+                regressions.append(f"{transport} {phase}: p99 {stats['p99_ms']:.2f} ms, baseline {base['p99_ms']:.2f} ms")
+    return regressions
+
+
+@click.command()
+@click.argument("spec_path")
+@click.option("--transport", "transports", multiple=True, type=click.Choice(["stdio", "sse"]),
+              help="Transport to measure, can be repeated (default: stdio and sse)")
+@click.option("--tool", "tools", multiple=True, help="Tool to call, can be repeated (default: endpoint_v1_models_get)")
+@click.option("--calls", default=1000, help="Number of tool calls per transport")
+@click.option("--list-calls", default=100, help="Number of list_tools calls per transport")
+@click.option("--concurrency", default=8, help="Number of concurrent tool calls")
+@click.option("--warmup", default=50, help="Number of tool calls before measuring")
+@click.option("--mock-args", default="", help="Options of mock_upstream.py, e.g. '--latency exp:20 --items fixed:50'")
+@click.option("--server-args", default="", help="Extra options of mcp_server.py, e.g. '--response-cache'")
+@click.option("--report", "report_path", help="Path of the JSON report to write")
+@click.option("--baseline", "baseline_path", help="JSON report of a previous run to compare with")
+@click.option("--max-regression", default=0.2, help="Regression tolerated against the baseline, as a fraction")
+def main(spec_path: str, transports: Tuple[str, ...], tools: Tuple[str, ...], calls: int, list_calls: int,
+         concurrency: int, warmup: int, mock_args: str, server_args: str, report_path: Optional[str],
+         baseline_path: Optional[str], max_regression: float):
+    """Measure the list_tools and call_tool throughput and latency of mcp_server.py."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    transports = transports or ("stdio", "sse")
+    tools = tools or ("endpoint_v1_models_get",)
+
+    async def measure(session: ClientSession) -> Dict[str, Any]:
+        await _measure(session, tools, 0, warmup, concurrency)
+        return await _measure(session, tools, list_calls, calls, concurrency)
+
+    report = {
+        "version": REPORT_VERSION,
+        "meta": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "tools": list(tools),
+            "calls": calls,
+            "list_calls": list_calls,
+            "concurrency": concurrency,
+            "mock_args": mock_args,
+            "server_args": server_args,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upstream, mock_spec_path = start_mock_upstream(spec_path, tmp_dir, tuple(shlex.split(mock_args)))
+        server_command = [sys.executable, os.path.join(here, "mcp_server.py"), mock_spec_path, *shlex.split(server_args)]
+        try:
+            for transport in transports:
+                results = report["results"][transport] = _run_transport(transport, server_command, measure)
+                for phase, stats in results.items():
+                    click.echo(f"{transport:6} {phase:10}: {_describe(stats)}")
+        finally:
+            stop_process(upstream)
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = [
+        f"{transport} {phase}: {stats['errors']} failed calls"
+        for transport, phases in report["results"].items()
+        for phase, stats in phases.items()
+        if stats["errors"]
+    ]
+    for failure in failures:
+        click.echo(f"Error: {failure}", err=True)
+    if failures:
+        sys.exit(1)
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(report, json.load(f), max_regression)
+        for regression in regressions:
+            click.echo(f"Regression: {regression}", err=True)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
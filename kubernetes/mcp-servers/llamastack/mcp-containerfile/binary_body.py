@@ -0,0 +1,135 @@
+import mimetypes
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_BINARY_LIMIT = 8 * 1024 * 1024
+DEFAULT_SPILL_TTL = 3600.0
+DEFAULT_SPILL_MAX_BYTES = 1024 * 1024 * 1024
+
+SPILL_PREFIX = 'response-'
+
+# content types with a text body, besides text/*
+_TEXT_MARKERS = ('json', 'xml', 'yaml', 'javascript', 'x-www-form-urlencoded')
+
+
+def is_binary(content_type: str) -> bool:
+    """Check whether a response content type has a binary body."""
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    if not content_type or content_type.startswith('text/'):
+        return False
+    return not any(marker in content_type for marker in _TEXT_MARKERS)
+
+
+class SpillDirectory:
+    """
+    The directory where binary bodies too large to be held in memory are saved.
+
+    Saved bodies are deleted ttl seconds after they were written, and the oldest ones are
+    deleted first when the directory holds more than max_bytes. The file of a body keeps the
+    extension of its content type, from which its type is guessed when it is read back.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_SPILL_TTL, max_bytes: int = DEFAULT_SPILL_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def open(self, content_type: str):
+        """Open a new file for a body of the given content type."""
+        os.makedirs(self.path, exist_ok=True)
+        suffix = mimetypes.guess_extension(content_type.split(';', 1)[0].strip()) or ''
+        return tempfile.NamedTemporaryFile(dir=self.path, prefix=SPILL_PREFIX, suffix=suffix, delete=False)
+
+    def file(self, name: str) -> Optional[str]:
+        """Get the path of a saved body by file name, if it is still there."""
+        if name != os.path.basename(name) or not name.startswith(SPILL_PREFIX):
+            return None
+        path = os.path.join(self.path, name)
+        return path if os.path.isfile(path) else None
+
+    def files(self) -> List[Tuple[str, os.stat_result]]:
+        """List the saved bodies, oldest first."""
+        try:
+            entries = [entry for entry in os.scandir(self.path) if entry.name.startswith(SPILL_PREFIX) and entry.is_file()]
+        except FileNotFoundError:
+            return []
+        files = []
+        for entry in entries:
+            try:
+                files.append((entry.path, entry.stat()))
+            except FileNotFoundError:
+                # deleted meanwhile, e.g. by another worker
+                continue
+        return sorted(files, key=lambda file: file[1].st_mtime)
+
+    def prune(self, keep: Optional[str] = None, now: Optional[float] = None) -> int:
+        """Delete the expired bodies, then the oldest ones over max_bytes, except keep; returns the number deleted."""
+        now = time.time() if now is None else now
+        files = [(path, stat) for path, stat in self.files() if path != keep]
+        total = sum(stat.st_size for _, stat in files)
+        if keep is not None:
+            try:
+                total += os.path.getsize(keep)
+            except OSError:
+                pass
+        deleted = 0
+        for path, stat in files:
+            if now - stat.st_mtime <= self.ttl and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            deleted += 1
+        return deleted
+
+
+async def read_binary(response: httpx.Response, limit: int = DEFAULT_BINARY_LIMIT,
+                      spill_dir: Optional[SpillDirectory] = None) -> Dict[str, Any]:
+    """
+    Read the binary body of a streamed response into a single buffer.
+
+    A body larger than limit bytes is written to a file in spill_dir instead, and the result
+    has the path of the file rather than the data; without a spill_dir it is an error.
+    """
+    content_type = response.headers.get('content-type', 'application/octet-stream')
+    declared = response.headers.get('content-length')
+    buffer = bytearray()
+    spill = None
+
+    try:
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            spill = _open_spill_file(spill_dir, limit, content_type)
+        async for chunk in response.aiter_bytes():
+            if spill is None and len(buffer) + len(chunk) > limit:
+                spill = _open_spill_file(spill_dir, limit, content_type)
+                spill.write(buffer)
+                buffer = bytearray()
+            if spill is None:
+                buffer += chunk
+            else:
+                spill.write(chunk)
+    except BaseException:
+        if spill is not None:
+            spill.close()
+            os.remove(spill.name)
+        raise
+
+    if spill is not None:
+        size = spill.tell()
+        spill.close()
+        # the directory is kept bounded as new bodies are saved
+        spill_dir.prune(keep=spill.name)
+        return {'content_type': content_type, 'file': spill.name, 'size': size}
+    return {'content_type': content_type, 'data': buffer}
+
+
+def _open_spill_file(spill_dir: Optional[SpillDirectory], limit: int, content_type: str):
+    if spill_dir is None:
+        raise ValueError(f"The response body is larger than the {limit} bytes limit")
+    return spill_dir.open(content_type)
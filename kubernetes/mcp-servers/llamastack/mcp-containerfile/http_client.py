@@ -0,0 +1,179 @@
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class ClientSettings:
+    """Connection pool, protocol and timeout settings of the upstream HTTP client."""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 5.0, http2: bool = False, timeout: float = 30.0,
+                 operation_timeouts: Optional[Dict[str, float]] = None):
+        """Initialize the settings; operation_timeouts maps an operation_id to its timeout in seconds."""
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.timeout = timeout
+        self.operation_timeouts = dict(operation_timeouts or {})
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def timeout_for(self, operation_id: str) -> float:
+        return self.operation_timeouts.get(operation_id, self.timeout)
+
+
+class RetryPolicy:
+    """
+    Retries of idempotent requests that failed with a transient error: a connection error,
+    a timeout waiting for a pooled connection, or a 429/502/503/504 status. A request that
+    timed out after it was sent is not retried, so that a slow API does not make a call last
+    several times its timeout.
+
+    The delay before a retry is the Retry-After of the response when there is one (capped
+    at max_backoff), else a random delay up to an exponentially growing bound ("full jitter").
+    """
+
+    def __init__(self, max_retries: int = 2, backoff: float = 0.2, max_backoff: float = 10.0,
+                 statuses: Iterable[int] = RETRY_STATUSES):
+        """Initialize the policy; backoff is the bound of the first delay, in seconds."""
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        return method in IDEMPOTENT_METHODS and attempt < self.max_retries
+
+    @staticmethod
+    def is_transient(error: httpx.TransportError) -> bool:
+        """
+        Whether a request that failed with error may be retried: any transport error but a read or
+        write timeout. Connect and pool timeouts happen before the request is sent, so they are retried.
+        """
+        return (not isinstance(error, httpx.TimeoutException)
+                or isinstance(error, (httpx.ConnectTimeout, httpx.PoolTimeout)))
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Get the delay before retry number attempt (from 0)."""
+        if response is not None:
+            retry_after = _parse_retry_after(response.headers.get('retry-after'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class UpstreamClient:
+    """An httpx client to the upstream API, with retries and in-flight request counters."""
+
+    def __init__(self, base_url: str, settings: Optional[ClientSettings] = None,
+                 retry_policy: Optional[RetryPolicy] = None, headers: Optional[Dict[str, str]] = None,
+                 tracing: Optional[Any] = None):
+        """
+        Initialize the client; settings and retry_policy default to the default ClientSettings and RetryPolicy.
+        With tracing (a tracing.Tracing), each attempt of a request gets a span propagated to the API.
+        """
+        self.settings = settings or ClientSettings()
+        self.tracing = tracing
+        self.retry_policy = retry_policy or RetryPolicy()
+        try:
+            self.client = httpx.AsyncClient(
+                base_url=base_url,
+                follow_redirects=True,
+                headers=headers,
+                limits=self.settings.limits(),
+                timeout=self.settings.timeout,
+                http2=self.settings.http2
+            )
+        except ImportError as e:
+            raise RuntimeError("HTTP/2 requires the h2 package, install it with: pip install 'httpx[http2]'") from e
+
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def request(self, operation_id: str, method: str, path: str, stream: bool = False,
+                      **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying transient failures of idempotent methods.
+        With stream, the body of the response is not read, and the caller must close the response.
+        """
+        timeout = self.settings.timeout_for(operation_id)
+        attempt = 0
+        while True:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                request = self.client.build_request(method, path, timeout=timeout, **kwargs)
+                if self.tracing is None:
+                    response = await self.client.send(request, stream=stream)
+                else:
+                    response = await self._send_traced(operation_id, request, attempt, stream)
+            except httpx.TransportError as e:
+                if not self.retry_policy.is_transient(e) or not self.retry_policy.can_retry(method, attempt):
+                    self.errors += 1
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if response.status_code not in self.retry_policy.statuses or not self.retry_policy.can_retry(method, attempt):
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+                await response.aclose()
+            finally:
+                self.in_flight -= 1
+
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _send_traced(self, operation_id: str, request: httpx.Request, attempt: int, stream: bool) -> httpx.Response:
+        with self.tracing.request_span(operation_id, request, attempt) as span:
+            self.tracing.inject(request)
+            response = await self.client.send(request, stream=stream)
+            self.tracing.record_response(span, response)
+            return response
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the request, retry and in-flight counters; in_flight_ratio is the requests being sent over max_connections."""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'in_flight_ratio': self.in_flight / self.settings.max_connections,
+            'http2': self.settings.http2,
+        }
@@ -0,0 +1,113 @@
+"""
+Load test of the streamable HTTP transport: measures tool call throughput for several worker counts.
+
+A mock of the upstream API (mock_upstream.py, answering instantly by default) is started in a
+separate process, and mcp_server.py is started against it, so the measured throughput is that of
+the MCP server itself.
+
+    python load_test.py ./openapi.json --workers 1,2,4 --concurrency 64 --duration 10
+"""
+import asyncio
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import click
+import httpx
+
+from mcp_server import TOOL_ERROR_PREFIX
+from mock_upstream import free_port, start_mock_upstream, stop_process, wait_until_listening
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _failed(result: dict) -> bool:
+    # servers that predate isError only flagged failed calls by the text of the result
+    return result.get("isError") or any(
+        content.get("text", "").startswith(TOOL_ERROR_PREFIX) for content in result.get("content", [])
+    )
+
+
+async def _drive(url: str, tool: str, concurrency: int, duration: float) -> dict:
+    """Call the tool from concurrency clients for duration seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def client(client_id: int, http: httpx.AsyncClient):
+        nonlocal errors
+        request_id = 0
+        while time.monotonic() < deadline:
+            request_id += 1
+            payload = {
+                "jsonrpc": "2.0",
+                "id": f"{client_id}-{request_id}",
+                "method": "tools/call",
+                "params": {"name": tool, "arguments": {}},
+            }
+            start = time.perf_counter()
+            try:
+                response = await http.post(url, json=payload, headers=HEADERS)
+                if response.status_code != 200 or _failed(response.json()["result"]):
+                    errors += 1
+            except (httpx.HTTPError, ValueError, KeyError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as http:
+        await asyncio.gather(*(client(i, http) for i in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "calls_per_s": len(latencies) / duration,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else None,
+        "errors": errors,
+    }
+
+
+@click.command()
+@click.argument("spec_path")
+@click.option("--workers", "worker_counts", default="1,2,4", help="Comma-separated worker counts to measure")
+@click.option("--concurrency", default=64, help="Number of concurrent clients")
+@click.option("--duration", default=10.0, help="Seconds of load per worker count")
+@click.option("--tool", default="endpoint_v1_models_get", help="Tool to call")
+@click.option("--mock-args", default="", help="Options of mock_upstream.py, e.g. '--latency exp:20 --items fixed:50'")
+def main(spec_path: str, worker_counts: str, concurrency: int, duration: float, tool: str, mock_args: str):
+    """Measure the tool call throughput of mcp_server.py for each worker count."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upstream, mock_spec_path = start_mock_upstream(spec_path, tmp_dir, tuple(shlex.split(mock_args)))
+        results = {}
+        try:
+            for workers in (int(w) for w in worker_counts.split(",")):
+                port = free_port()
+                server = subprocess.Popen(
+                    [sys.executable, os.path.join(here, "mcp_server.py"), mock_spec_path,
+                     "--transport", "streamable-http", "--port", str(port), "--workers", str(workers)],
+                    cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                try:
+                    wait_until_listening(port)
+                    url = f"http://127.0.0.1:{port}/mcp/"
+                    asyncio.run(_drive(url, tool, concurrency, min(duration, 2.0)))  # warm-up
+                    results[workers] = asyncio.run(_drive(url, tool, concurrency, duration))
+                finally:
+                    stop_process(server)
+                stats = results[workers]
+                click.echo(f"{workers} worker(s): {stats['calls_per_s']:8.1f} calls/s   "
+                           f"p50 {stats['p50_ms']:7.2f} ms   p99 {stats['p99_ms']:7.2f} ms   errors {stats['errors']}")
+        finally:
+            stop_process(upstream)
+
+    click.echo(f"({os.cpu_count()} CPUs; throughput can only scale up to the number of CPUs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,136 @@
+import asyncio
+import base64
 import click
-import tempfile
+import contextlib
+import copy
+import functools
+import logging
+import mimetypes
+import os
 import json
-from typing import Dict, List, Optional, Any
+import tempfile
+import time
+import urllib.parse
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple, Union
 import anyio
+from pydantic import AnyUrl
 from mcp.server.lowlevel import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 import mcp.types as types
-from openapi_parser import OpenAPIToolsManager
+from openapi_parser import OpenAPISpec, OpenAPIToolsManager
+from spec_registry import PREFIX_RE, SpecRegistry, is_remote_spec, operation_values
+from response_cache import ResponseCache
+from http_client import ClientSettings, RetryPolicy
+from tool_filter import ToolFilter, footprint_report
+from binary_body import DEFAULT_BINARY_LIMIT, DEFAULT_SPILL_MAX_BYTES, DEFAULT_SPILL_TTL, SpillDirectory
+from metrics import ToolMetrics
+from tracing import Tracing, configure_tracing
+from result_format import FIELDS_ARGUMENT, FIELDS_SCHEMA, project, serialize, truncate_text
+from mcp.server.fastmcp.exceptions import ToolError
 from mcp.server.fastmcp.prompts import Prompt, PromptManager
 from custom_prompts import create_agent_prompt
 
+logger = logging.getLogger(__name__)
+
+# name of the synthetic tool running several tool calls concurrently
+BATCH_TOOL_NAME = "batch_api_calls"
+MAX_BATCH_CALLS = 32
+BATCH_TOOL_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'calls': {
+            'type': 'array',
+            'description': "Independent tool calls to run concurrently",
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'operation_id': {'type': 'string', 'description': "Name of the tool to call"},
+                    'arguments': {'type': 'object', 'description': "Arguments of the tool"},
+                },
+                'required': ['operation_id'],
+            },
+            'minItems': 1,
+            'maxItems': MAX_BATCH_CALLS,
+        },
+    },
+    'required': ['calls'],
+}
+
+# start of the text of failed tool calls
+TOOL_ERROR_PREFIX = "Error executing tool: "
+
+# URI prefix of the binary results saved in the spill directory, served as resources
+SPILL_URI_PREFIX = "openapi://spill/"
+
+# environment variable passing the CLI options to the worker processes
+SERVER_OPTIONS_ENV = "MCP_OPENAPI_SERVER_OPTIONS"
+
 class MCPOpenAPIServer:
     """MCP Server that provides OpenAPI tools and prompts."""
 
-    def __init__(self, spec_path: str):
-        """Initialize the server with an OpenAPI specification."""
-        with open(spec_path, 'r') as file:
-            spec = json.load(file)
-
-        # Create a temporary file to save the spec as a string, note: to be removed later
-        with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.json') as tmp_file:
-            # Write the loaded spec as a JSON string to the temporary file
-            json.dump(spec, tmp_file)
-            temp_spec_path = tmp_file.name
+    def __init__(self, specs: Union[str, Dict[str, str]], spec_cache: bool = False,
+                 response_cache: Optional[Callable[[], ResponseCache]] = None,
+                 coalesce: bool = True, client_settings: Optional[ClientSettings] = None,
+                 retry_policy: Optional[RetryPolicy] = None, tool_filter: Optional[ToolFilter] = None,
+                 result_budget: Optional[int] = None, result_budgets: Optional[Dict[str, int]] = None,
+                 field_projection: bool = False, binary_limit: int = DEFAULT_BINARY_LIMIT,
+                 spill_dir: Optional[SpillDirectory] = None, metrics: bool = False, tracing: Optional[Tracing] = None,
+                 batch_concurrency: Optional[int] = None, reload_interval: Optional[float] = None):
+        """
+        Initialize the server with an OpenAPI specification, or several ones given as a mapping of
+        tool name prefix to spec, each with its own base URL and connection pool. response_cache
+        creates the cache of GET responses of each spec, if given. With reload_interval, changed
+        spec files are reloaded in the background every reload_interval seconds.
+        Only the operations selected by tool_filter are exposed as tools. Tool results are cut to
+        result_budget bytes, or to the budget of the tool in result_budgets, and tools accept a
+        field projection argument if field_projection is set. Binary results over binary_limit
+        bytes are saved to files in spill_dir, and served as resources. With metrics, the tool
+        calls are measured and served in the Prometheus format on /metrics by the HTTP transports.
+        With tracing, tool calls and their upstream requests get OpenTelemetry spans. With
+        batch_concurrency, a batch tool runs several tool calls concurrently, at most
+        batch_concurrency at a time.
+
+        Per-operation settings (tool_filter operations, result_budgets, the operation timeouts of
+        client_settings and the TTL overrides of response_cache) are keyed by tool name, that is
+        the operationId prefixed with the prefix of its spec, if any.
+        """
+        self.tracing = tracing
+        self.batch_concurrency = batch_concurrency
+        self.reload_interval = reload_interval
+        self.tool_filter = tool_filter or ToolFilter()
+        self.result_budget = result_budget
+        self.result_budgets = dict(result_budgets or {})
+        self.field_projection = field_projection
+        self.spill_dir = spill_dir
+
+        def create_manager(prefix: str, api_spec: OpenAPISpec) -> OpenAPIToolsManager:
+            # the managers of the specs key their settings by operationId
+            cache = response_cache() if response_cache else None
+            if cache is not None:
+                cache.ttl_overrides = operation_values(cache.ttl_overrides, prefix)
+            settings = None
+            if client_settings is not None:
+                settings = copy.copy(client_settings)
+                settings.operation_timeouts = operation_values(client_settings.operation_timeouts, prefix)
+            return OpenAPIToolsManager(
+                api_spec,
+                response_cache=cache,
+                coalesce=coalesce,
+                client_settings=settings,
+                retry_policy=retry_policy,
+                binary_limit=binary_limit,
+                spill_dir=spill_dir,
+                tracing=tracing
+            )
 
+        self.specs = SpecRegistry({'': specs} if isinstance(specs, str) else specs, create_manager, spec_cache)
 
+        self.metrics = ToolMetrics(self.specs.stats) if metrics else None
 
+        # The tool list is built once and only rebuilt when a spec is reloaded
+        self._tools: Optional[List[types.Tool]] = None
+        self._tools_version = self.specs.version
 
-        self.api_tools = OpenAPIToolsManager(temp_spec_path)
         self.app = Server(name="mcp-openapi-tools-and-prompts")
         self.prompt_manager = PromptManager(warn_on_duplicate_prompts=True)
 
@@ -54,7 +158,19 @@ class MCPOpenAPIServer:
 
         @self.app.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-            return await self._execute_tool(name, arguments)
+            if self.tracing is None:
+                return await self._execute_tool(name, arguments)
+            with self.tracing.tool_span(name, self._trace_carrier()):
+                return await self._execute_tool(name, arguments)
+
+        if self.spill_dir is not None:
+            @self.app.list_resources()
+            async def list_resources() -> List[types.Resource]:
+                return await asyncio.to_thread(self._list_spilled)
+
+            @self.app.read_resource()
+            async def read_resource(uri: AnyUrl) -> Iterable[ReadResourceContents]:
+                return [await asyncio.to_thread(self._read_spilled, str(uri))]
 
         @self.app.list_prompts()
         async def list_prompts() -> List[types.Prompt]:
@@ -64,39 +180,202 @@ class MCPOpenAPIServer:
         async def get_prompt(name: str, arguments: Optional[Dict[str, str]] = None) -> types.GetPromptResult:
             return await self._get_prompt_result(name, arguments)
 
-    async def _execute_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        """Execute a tool by name with the given arguments."""
-        try:
-            # Initialize client if needed
-            if self.api_tools.client is None:
-                await self.api_tools.initialize_client()
+    def _list_spilled(self) -> List[types.Resource]:
+        """List the binary results saved in the spill directory as resources."""
+        return [
+            types.Resource(
+                uri=SPILL_URI_PREFIX + os.path.basename(path),
+                name=os.path.basename(path),
+                mimeType=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                size=stat.st_size
+            )
+            for path, stat in self.spill_dir.files()
+        ]
 
-            result = await self.api_tools.execute_api_call(name, arguments)
+    def _read_spilled(self, uri: str) -> ReadResourceContents:
+        """Read a binary result saved in the spill directory."""
+        path = self.spill_dir.file(uri[len(SPILL_URI_PREFIX):]) if uri.startswith(SPILL_URI_PREFIX) else None
+        if path is None:
+            raise ValueError(f"Unknown or expired resource: {uri}")
+        with open(path, 'rb') as f:
+            return ReadResourceContents(content=f.read(), mime_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
 
-            content_type = result.get('content_type', '')
-            data = result.get('data', '')
+    def _trace_carrier(self) -> Dict[str, Any]:
+        """Get the trace context of the current MCP request, from its HTTP headers or its _meta."""
+        try:
+            context = self.app.request_context
+        except LookupError:
+            return {}
+        carrier = {}
+        if context.request is not None and hasattr(context.request, 'headers'):
+            carrier.update(context.request.headers)
+        if context.meta is not None and context.meta.model_extra:
+            carrier.update({k: v for k, v in context.meta.model_extra.items() if isinstance(v, str)})
+        return carrier
 
-            if 'application/json' in content_type:
-                if isinstance(data, dict) or isinstance(data, list):
-                    return [types.TextContent(type="text", text=json.dumps(data, indent=2))]
-                else:
-                    return [types.TextContent(type="text", text=str(data))]
-            elif 'image/' in content_type and isinstance(data, bytes):
-                return [types.ImageContent(type="image", data=data)]
-            else:
-                return [types.TextContent(type="text", text=str(data))]
+    async def _execute_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Execute a tool by name with the given arguments; errors are raised as a ToolError, which the MCP layer returns with isError set."""
+        try:
+            if name == BATCH_TOOL_NAME and self.batch_concurrency:
+                return await self._execute_batch(arguments)
+            return await self._run_tool(name, arguments)
         except Exception as e:
-            return [types.TextContent(type="text", text=f"Error executing tool: {str(e)}")]
+            if self.tracing is not None:
+                self.tracing.record_error(e)
+            raise ToolError(f"{TOOL_ERROR_PREFIX}{e}") from e
+
+    async def _run_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Call the API operation of a tool, raising on errors."""
+        series = None
+        start = upstream_end = None
+        try:
+            # the route is resolved once, so a spec reloaded during the call does not affect it
+            route = self.specs.resolve(name)
+            if route is None or not self.tool_filter.selects(route[1], name):
+                raise ValueError(f"Unknown tool: {name}")
+            api_tools, endpoint = route
+
+            if self.metrics is not None:
+                series = self.metrics.series(name)
+                series.start()
+            start = time.perf_counter()
+
+            fields = None
+            if FIELDS_ARGUMENT in arguments and self._projects_fields(api_tools, endpoint):
+                arguments = dict(arguments)
+                fields = arguments.pop(FIELDS_ARGUMENT)
+
+            # the call is counted before the first await, so a replaced manager waits for it before closing
+            with api_tools.call():
+                # Initialize client if needed
+                if api_tools.client is None:
+                    await api_tools.initialize_client()
+
+                result = await api_tools.execute_api_call(endpoint['operation_id'], arguments)
+            upstream_end = time.perf_counter()
+
+            content = self._format_result(name, result, fields)
+            if series is not None:
+                series.finish(upstream_end - start, time.perf_counter() - upstream_end, error=False)
+            return content
+        except Exception:
+            if series is not None:
+                end = upstream_end or time.perf_counter()
+                series.finish(end - start, None, error=True)
+            raise
+
+    async def _execute_batch(self, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """
+        Run the calls of a batch concurrently, at most batch_concurrency at a time.
+        The result has the content of each call, in order, each preceded by a line with its
+        index, operation and status; a failed call does not fail the others.
+        """
+        calls = arguments.get('calls')
+        if not isinstance(calls, list) or not calls:
+            raise ValueError("calls must be a non-empty list of {operation_id, arguments} objects")
+        if len(calls) > MAX_BATCH_CALLS:
+            raise ValueError(f"A batch can have at most {MAX_BATCH_CALLS} calls, got {len(calls)}")
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(call: Any) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+            if not isinstance(call, dict) or not isinstance(call.get('operation_id'), str):
+                raise ValueError("each call needs an operation_id")
+            if call['operation_id'] == BATCH_TOOL_NAME:
+                raise ValueError("batches cannot be nested")
+            async with semaphore:
+                return await self._run_tool(call['operation_id'], call.get('arguments') or {})
+
+        results = await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+        content = []
+        for index, (call, result) in enumerate(zip(calls, results)):
+            operation_id = call.get('operation_id') if isinstance(call, dict) else None
+            if isinstance(result, BaseException):
+                content.append(types.TextContent(type="text", text=f"[{index}] {operation_id}: error\n{result}"))
+            else:
+                content.append(types.TextContent(type="text", text=f"[{index}] {operation_id}: ok"))
+                content.extend(result)
+        return content
+
+    def _format_result(self, name: str, result: Dict[str, Any], fields: Optional[List[str]]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Turn the result of an API call into tool result content."""
+        content_type = result.get('content_type', '')
+        data = result.get('data', '')
+        budget = self.result_budgets.get(name, self.result_budget)
+
+        if 'file' in result:
+            uri = SPILL_URI_PREFIX + os.path.basename(result['file'])
+            return [types.TextContent(
+                type="text",
+                text=f"The {result['size']} bytes {content_type} response was saved as the resource {uri}"
+            )]
+        elif 'application/json' in content_type:
+            if isinstance(data, dict) or isinstance(data, list):
+                return [types.TextContent(type="text", text=serialize(project(data, fields), budget))]
+            else:
+                return [types.TextContent(type="text", text=truncate_text(str(data), budget))]
+        elif isinstance(data, (bytes, bytearray)):
+            # the body was read into a single buffer, which is base64-encoded once
+            encoded = base64.b64encode(data).decode('ascii')
+            mime_type = content_type.split(';', 1)[0].strip()
+            if mime_type.startswith('image/'):
+                return [types.ImageContent(type="image", data=encoded, mimeType=mime_type)]
+            return [types.EmbeddedResource(
+                type="resource",
+                resource=types.BlobResourceContents(uri=f"openapi://{name}/result", mimeType=mime_type, blob=encoded)
+            )]
+        else:
+            return [types.TextContent(type="text", text=truncate_text(str(data), budget))]
+
+    def _projects_fields(self, api_tools: OpenAPIToolsManager, endpoint: Dict[str, Any]) -> bool:
+        """
+        Whether a tool takes the field projection argument: only with field_projection, for operations
+        that may return JSON, and unless the operation has a parameter of the same name.
+        """
+        if not self.field_projection or FIELDS_ARGUMENT in api_tools.generate_input_schema(endpoint)['properties']:
+            return False
+        content_types = [
+            content_type
+            for status, response in endpoint.get('responses', {}).items()
+            if str(status).startswith('2') and isinstance(response, dict)
+            for content_type in response.get('content') or {}
+        ]
+        # an operation that does not declare its response content may still return JSON
+        return not content_types or any('json' in content_type for content_type in content_types)
+
+    def tool_report(self) -> str:
+        """Report the token footprint of the exposed tools."""
+        return footprint_report(self._build_tools(selected_only=False), self._get_tools())
 
     def _get_tools(self) -> List[types.Tool]:
-        """Get a list of all tools from the OpenAPI specification."""
+        """Get the (memoized) list of all tools from the OpenAPI specifications."""
+        if self._tools is None or self._tools_version != self.specs.version:
+            self._tools_version = self.specs.version
+            self._tools = self._build_tools()
+        return self._tools
+
+    def _build_tools(self, selected_only: bool = True) -> List[types.Tool]:
+        """Build the list of the selected (or all) tools from the OpenAPI specifications."""
         tools = []
 
-        for endpoint in self.api_tools.get_endpoints():
+        for name, api_tools, endpoint in self.specs.tools():
+            if selected_only and not self.tool_filter.selects(endpoint, name):
+                continue
+            input_schema = api_tools.generate_input_schema(endpoint)
+            if self._projects_fields(api_tools, endpoint):
+                input_schema = {**input_schema, 'properties': {**input_schema['properties'], FIELDS_ARGUMENT: FIELDS_SCHEMA}}
             tools.append(types.Tool(
-                name=endpoint['operation_id'],
+                name=name,
                 description=endpoint.get('summary', '') or endpoint.get('description', '') or f"Call {endpoint['method'].upper()} {endpoint['path']}",
-                inputSchema=self.api_tools.generate_input_schema(endpoint)
+                inputSchema=input_schema
+            ))
+
+        if self.batch_concurrency:
+            tools.append(types.Tool(
+                name=BATCH_TOOL_NAME,
+                description="Run several independent tool calls at once, and get all their results in one response",
+                inputSchema=BATCH_TOOL_SCHEMA
             ))
 
         return tools
@@ -148,26 +427,67 @@ class MCPOpenAPIServer:
         except Exception as e:
             raise ValueError(f"Error rendering prompt {name}: {str(e)}")
 
-    async def run(self, transport: str, port: int):
+    async def run(self, transport: str, port: int, debug: bool = False):
         """Run the MCP server with the specified transport."""
-        # Initialize the HTTP client
-        await self.api_tools.initialize_client()
-
-        try:
-            if transport == "sse":
-                await self._run_sse(port)
-            else:
+        if transport == "stdio":
+            async with self._serving():
                 await self._run_stdio()
+        else:
+            import uvicorn
+
+            config = uvicorn.Config(self.http_app(transport, debug), host="0.0.0.0", port=port)
+            server = uvicorn.Server(config)
+            await server.serve()
+
+    @contextlib.asynccontextmanager
+    async def _serving(self):
+        """Open the HTTP clients and watch the spec files while serving, then log the tool call stats."""
+        await self.specs.start()
+        watch = None
+        if self.reload_interval:
+            watch = asyncio.create_task(self.specs.watch(self.reload_interval))
+        try:
+            yield
         finally:
-            # Clean up the HTTP client
-            await self.api_tools.close_client()
+            if watch is not None:
+                watch.cancel()
+            await self.specs.close()
+            stats = self.specs.stats()
+            if stats:
+                logger.info(f"Tool call stats: {json.dumps(stats)}")
+
+    def http_app(self, transport: str, debug: bool = False):
+        """
+        Create the Starlette app serving the MCP server over SSE or streamable HTTP.
+        The HTTP clients live for the lifespan of the app.
+        """
+        from starlette.applications import Starlette
+
+        if transport == "sse":
+            routes, session_manager = self._sse_routes(), None
+        else:
+            routes, session_manager = self._streamable_http_routes()
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with self._serving():
+                if session_manager is None:
+                    yield
+                else:
+                    async with session_manager.run():
+                        yield
+
+        if self.metrics is not None:
+            from starlette.routing import Route
+
+            routes.append(Route("/metrics", endpoint=self.metrics.endpoint))
+
+        return Starlette(debug=debug, routes=routes, lifespan=lifespan)
 
-    async def _run_sse(self, port: int):
-        """Run the server with SSE transport."""
+    def _sse_routes(self) -> list:
+        """Get the routes of the SSE transport."""
         from mcp.server.sse import SseServerTransport
-        from starlette.applications import Starlette
         from starlette.routing import Mount, Route
-        import uvicorn
 
         sse = SseServerTransport("/messages/")
 
@@ -179,17 +499,24 @@ class MCPOpenAPIServer:
                     streams[0], streams[1], self.app.create_initialization_options()
                 )
 
-        starlette_app = Starlette(
-            debug=True,
-            routes=[
-                Route("/sse", endpoint=handle_sse),
-                Mount("/messages/", app=sse.handle_post_message),
-            ],
-        )
+        return [
+            Route("/sse", endpoint=handle_sse),
+            Mount("/messages/", app=sse.handle_post_message),
+        ]
+
+    def _streamable_http_routes(self) -> tuple:
+        """Get the routes of the streamable HTTP transport, with their session manager."""
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.routing import Mount
 
-        config = uvicorn.Config(starlette_app, host="0.0.0.0", port=port)
-        server = uvicorn.Server(config)
-        await server.serve()
+        # The server only answers requests (it never sends notifications), so it runs stateless
+        # with plain JSON responses: any worker can serve any request, without sticky sessions.
+        session_manager = StreamableHTTPSessionManager(app=self.app, json_response=True, stateless=True)
+
+        async def handle_streamable_http(scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+
+        return [Mount("/mcp", app=handle_streamable_http)], session_manager
 
     async def _run_stdio(self):
         """Run the server with stdio transport."""
@@ -200,24 +527,281 @@ class MCPOpenAPIServer:
                 streams[0], streams[1], self.app.create_initialization_options()
             )
 
+def _parse_operation_values(values: Iterable[str], option: str, value_type: type = float) -> Dict[str, Any]:
+    """Parse repeated TOOL=VALUE option values, keyed by tool name."""
+    parsed = {}
+    for value in values:
+        name, sep, number = value.partition('=')
+        try:
+            parsed[name] = value_type(number)
+        except ValueError:
+            sep = ''
+        if not sep:
+            raise click.BadParameter(f"expected TOOL=VALUE, got {value}", param_hint=option)
+    return parsed
+
 @click.command()
-@click.argument('spec_path')
-@click.option("--port", default=8000, help="Port to listen on for SSE")
+@click.argument('spec_path', required=False)
+@click.option(
+    "--spec",
+    multiple=True,
+    metavar="PREFIX=PATH",
+    help="Another spec file or URL, whose tools are named PREFIX_<operationId> (repeatable)",
+)
+@click.option(
+    "--reload-interval",
+    default=5.0,
+    help="Seconds between checks of the spec files for changes, reloaded without a restart (0 to disable)",
+)
+@click.option("--port", default=8000, help="Port to listen on for SSE or streamable HTTP")
 @click.option(
     "--transport",
-    type=click.Choice(["stdio", "sse"]),
+    type=click.Choice(["stdio", "sse", "streamable-http"]),
     default="stdio",
     help="Transport type",
 )
-def main(spec_path: str, port: int, transport: str) -> int:
-    """Create MCP server with tools from an OpenAPI specification and custom prompts."""
-    server = MCPOpenAPIServer(spec_path)
+@click.option(
+    "--spec-cache/--no-spec-cache",
+    default=False,
+    help="Cache the compiled spec in a private directory, to skip parsing it on later starts",
+)
+@click.option(
+    "--response-cache/--no-response-cache",
+    default=False,
+    help="Cache the responses of GET tools, revalidating them with their ETag when stale",
+)
+@click.option("--cache-ttl", default=30.0, help="Seconds a cached GET response stays fresh, when the API does not say")
+@click.option(
+    "--cache-ttl-override",
+    multiple=True,
+    metavar="TOOL=SECONDS",
+    help="TTL of the cached responses of one tool, overriding Cache-Control (repeatable)",
+)
+@click.option(
+    "--coalesce/--no-coalesce",
+    default=True,
+    help="Share one upstream request between concurrent identical GET tool calls",
+)
+@click.option("--max-connections", default=100, help="Maximum number of connections to the API")
+@click.option("--max-keepalive", default=20, help="Maximum number of idle keep-alive connections to the API")
+@click.option("--keepalive-expiry", default=5.0, help="Seconds an idle keep-alive connection is kept open")
+@click.option("--http2/--no-http2", default=False, help="Use HTTP/2 to the API (needs the h2 package)")
+@click.option("--timeout", default=30.0, help="Timeout of the API requests, in seconds")
+@click.option(
+    "--operation-timeout",
+    multiple=True,
+    metavar="TOOL=SECONDS",
+    help="Timeout of the requests of one tool (repeatable)",
+)
+@click.option("--retries", default=2, help="Retries of idempotent requests failing with a transient error")
+@click.option(
+    "--workers",
+    default=1,
+    help="Number of server processes, for the streamable-http transport",
+)
+@click.option("--debug/--no-debug", default=False, help="Serve Starlette debug tracebacks on errors")
+@click.option("--include-tag", multiple=True, help="Only expose the operations with this tag (repeatable)")
+@click.option("--exclude-tag", multiple=True, help="Do not expose the operations with this tag (repeatable)")
+@click.option("--include-path", multiple=True, help="Only expose the operations whose path matches this glob (repeatable)")
+@click.option("--exclude-path", multiple=True, help="Do not expose the operations whose path matches this glob (repeatable)")
+@click.option("--include-operation", multiple=True, help="Only expose the tool with this name (repeatable)")
+@click.option("--exclude-operation", multiple=True, help="Do not expose the tool with this name (repeatable)")
+@click.option(
+    "--tool-filter",
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML or JSON file of include/exclude rules, combined with the options above",
+)
+@click.option(
+    "--result-budget",
+    default=32768,
+    help="Maximum size in bytes of a tool result (about 4 bytes per token), 0 for no limit",
+)
+@click.option(
+    "--result-budget-override",
+    multiple=True,
+    metavar="TOOL=BYTES",
+    help="Maximum size of the results of one tool (repeatable)",
+)
+@click.option(
+    "--field-projection/--no-field-projection",
+    default=False,
+    help=f"Let tool calls select the fields of JSON results with a {FIELDS_ARGUMENT} argument",
+)
+@click.option(
+    "--binary-limit",
+    default=DEFAULT_BINARY_LIMIT,
+    help="Maximum size in bytes of a binary (e.g. image) result held in memory",
+)
+@click.option(
+    "--spill-dir",
+    type=click.Path(file_okay=False),
+    help="Directory where binary results over --binary-limit are saved and served as resources, instead of failing",
+)
+@click.option(
+    "--spill-ttl",
+    default=DEFAULT_SPILL_TTL,
+    help="Seconds after which a saved binary result is deleted",
+)
+@click.option(
+    "--spill-max-bytes",
+    default=DEFAULT_SPILL_MAX_BYTES,
+    help="Maximum total size of the saved binary results, the oldest are deleted first",
+)
+@click.option(
+    "--metrics/--no-metrics",
+    default=True,
+    help="Serve Prometheus metrics of the tool calls on /metrics (SSE and streamable HTTP)",
+)
+@click.option(
+    "--tracing/--no-tracing",
+    default=False,
+    help="Export OpenTelemetry spans of the tool calls and upstream requests over OTLP/HTTP",
+)
+@click.option(
+    "--otlp-endpoint",
+    help="OTLP/HTTP traces endpoint, e.g. http://localhost:4318/v1/traces (default: OTEL_EXPORTER_OTLP_* variables)",
+)
+@click.option(
+    "--batch-tool/--no-batch-tool",
+    default=False,
+    help=f"Expose a {BATCH_TOOL_NAME} tool running several tool calls concurrently",
+)
+@click.option("--batch-concurrency", default=8, help="Maximum number of concurrent calls of a batch")
+@click.option(
+    "--report-tools",
+    is_flag=True,
+    help="Print the token footprint of the exposed tools and exit",
+)
+def main(spec_path: Optional[str], spec: Tuple[str, ...], port: int, transport: str, workers: int, debug: bool,
+         report_tools: bool, **options: Any) -> int:
+    """Create MCP server with tools from OpenAPI specifications and custom prompts."""
+    specs = _parse_specs(spec_path, spec)
+    if report_tools:
+        click.echo(_build_server(specs, options).tool_report())
+        return 0
+
+    if workers > 1:
+        if transport != "streamable-http":
+            raise click.UsageError("--workers needs the streamable-http transport, SSE sessions cannot be shared by workers")
+        import uvicorn
+
+        with tempfile.TemporaryDirectory(prefix="mcp-specs-") as spec_dir:
+            # Remote specs are fetched once here, and the workers load the local copies
+            specs = {
+                prefix: _download_spec(path, spec_dir, prefix) if is_remote_spec(path) else path
+                for prefix, path in specs.items()
+            }
+            # Compile the specs once here; the workers load the compiled caches instead of parsing the specs
+            for path in specs.values():
+                OpenAPISpec.from_file(path, use_cache=True)
+            options["spec_cache"] = True
+            os.environ[SERVER_OPTIONS_ENV] = json.dumps({"specs": specs, "debug": debug, **options})
+            uvicorn.run("mcp_server:create_app", factory=True, host="0.0.0.0", port=port, workers=workers)
+        return 0
+
+    server = _build_server(specs, options)
 
     async def run_server():
-        await server.run(transport, port)
+        await server.run(transport, port, debug)
 
     anyio.run(run_server)
     return 0
 
+
+def _download_spec(url: str, directory: str, prefix: str) -> str:
+    """Save a remote spec in directory, and get the path of the copy."""
+    extension = os.path.splitext(urllib.parse.urlparse(url).path)[1]
+    if extension not in ('.json', '.yaml', '.yml'):
+        extension = '.json'
+    path = os.path.join(directory, f"{prefix or 'spec'}{extension}")
+    with open(path, 'wb') as f:
+        f.write(OpenAPISpec.fetch(url))
+    return path
+
+
+def _parse_specs(spec_path: Optional[str], specs: Iterable[str]) -> Dict[str, str]:
+    """Map the tool name prefix of each spec to its path; the SPEC_PATH argument has no prefix."""
+    parsed = {'': spec_path} if spec_path else {}
+    for value in specs:
+        prefix, sep, path = value.partition('=')
+        if not sep or not prefix or not path:
+            raise click.BadParameter(f"expected PREFIX=PATH, got {value}", param_hint="--spec")
+        if not PREFIX_RE.match(prefix):
+            raise click.BadParameter(f"invalid prefix {prefix}, expected letters, digits and underscores", param_hint="--spec")
+        if prefix in parsed:
+            raise click.BadParameter(f"duplicate prefix {prefix}", param_hint="--spec")
+        parsed[prefix] = path
+    if not parsed:
+        raise click.UsageError("Give a SPEC_PATH, or at least one --spec PREFIX=PATH")
+    return parsed
+
+
+def _build_server(specs: Dict[str, str], options: Dict[str, Any]) -> MCPOpenAPIServer:
+    """Create the MCP server from the CLI options."""
+    cache = None
+    if options["response_cache"]:
+        # each spec gets its own cache
+        cache = functools.partial(
+            ResponseCache,
+            default_ttl=options["cache_ttl"],
+            ttl_overrides=_parse_operation_values(options["cache_ttl_override"], "--cache-ttl-override")
+        )
+    tracing = None
+    if options["tracing"]:
+        configure_tracing(endpoint=options["otlp_endpoint"])
+        tracing = Tracing()
+    client_settings = ClientSettings(
+        max_connections=options["max_connections"],
+        max_keepalive_connections=options["max_keepalive"],
+        keepalive_expiry=options["keepalive_expiry"],
+        http2=options["http2"],
+        timeout=options["timeout"],
+        operation_timeouts=_parse_operation_values(options["operation_timeout"], "--operation-timeout")
+    )
+    return MCPOpenAPIServer(
+        specs,
+        spec_cache=options["spec_cache"],
+        response_cache=cache,
+        coalesce=options["coalesce"],
+        client_settings=client_settings,
+        retry_policy=RetryPolicy(max_retries=options["retries"]),
+        tool_filter=_build_tool_filter(options),
+        result_budget=options["result_budget"] or None,
+        result_budgets=_parse_operation_values(options["result_budget_override"], "--result-budget-override", int),
+        field_projection=options["field_projection"],
+        binary_limit=options["binary_limit"],
+        spill_dir=SpillDirectory(
+            options["spill_dir"], ttl=options["spill_ttl"], max_bytes=options["spill_max_bytes"]
+        ) if options["spill_dir"] else None,
+        metrics=options["metrics"],
+        tracing=tracing,
+        batch_concurrency=options["batch_concurrency"] if options["batch_tool"] else None,
+        reload_interval=options["reload_interval"] or None
+    )
+
+
+def _build_tool_filter(options: Dict[str, Any]) -> ToolFilter:
+    """Create the tool filter from the CLI options."""
+    rules = {
+        "include_tags": options["include_tag"],
+        "exclude_tags": options["exclude_tag"],
+        "include_paths": options["include_path"],
+        "exclude_paths": options["exclude_path"],
+        "include_operations": options["include_operation"],
+        "exclude_operations": options["exclude_operation"],
+    }
+    if options["tool_filter"]:
+        return ToolFilter.from_file(options["tool_filter"], **rules)
+    return ToolFilter(**rules)
+
+
+def create_app():
+    """Create the streamable HTTP app of a worker process, from the options passed by main."""
+    options = json.loads(os.environ[SERVER_OPTIONS_ENV])
+    specs = options.pop("specs")
+    debug = options.pop("debug")
+    return _build_server(specs, options).http_app("streamable-http", debug)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+import os
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+SERIALIZATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# keys of OpenAPIToolsManager.stats() that are not monotonic counters
+_GAUGE_KEYS = {'in_flight', 'peak_in_flight', 'in_flight_ratio', 'entries', 'hit_rate'}
+
+
+class ToolSeries:
+    """The metric series of one tool, bound once so that recording a call is cheap."""
+
+    __slots__ = ('calls', 'errors', 'upstream', 'serialization', 'in_flight')
+
+    def __init__(self, metrics: 'ToolMetrics', tool: str):
+        self.calls = metrics.calls.labels(tool)
+        self.errors = metrics.errors.labels(tool)
+        self.upstream = metrics.upstream.labels(tool)
+        self.serialization = metrics.serialization.labels(tool)
+        self.in_flight = metrics.in_flight.labels(tool)
+
+    def start(self) -> None:
+        self.in_flight.inc()
+
+    def finish(self, upstream_seconds: Optional[float], serialization_seconds: Optional[float], error: bool) -> None:
+        """Record a finished call; the timings of the phases it did not reach are None."""
+        self.in_flight.dec()
+        self.calls.inc()
+        if error:
+            self.errors.inc()
+        if upstream_seconds is not None:
+            self.upstream.observe(upstream_seconds)
+        if serialization_seconds is not None:
+            self.serialization.observe(serialization_seconds)
+
+
+class _StatsCollector:
+    """Exports the counters of OpenAPIToolsManager.stats() (upstream requests, cache, coalescing) at scrape time."""
+
+    def __init__(self, stats: Callable[[], Dict[str, Any]]):
+        self.stats = stats
+
+    def collect(self) -> Iterator[Any]:
+        for section, values in self.stats().items():
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"mcp_{section}_{key}"
+                if key in _GAUGE_KEYS:
+                    yield GaugeMetricFamily(name, f"{section} {key}", value=value)
+                else:
+                    yield CounterMetricFamily(name, f"{section} {key}", value=value)
+
+
+class ToolMetrics:
+    """Prometheus metrics of the tool calls: counts, errors, upstream and serialization latency, in-flight calls."""
+
+    def __init__(self, stats: Optional[Callable[[], Dict[str, Any]]] = None):
+        """Initialize the metrics in their own registry; stats is polled for the upstream client counters."""
+        self.registry = CollectorRegistry()
+        self.calls = Counter(
+            'mcp_tool_calls', "Tool calls", ['tool'], registry=self.registry
+        )
+        self.errors = Counter(
+            'mcp_tool_errors', "Tool calls that returned an error", ['tool'], registry=self.registry
+        )
+        self.upstream = Histogram(
+            'mcp_tool_upstream_seconds', "Time spent calling the upstream API", ['tool'], registry=self.registry
+        )
+        self.serialization = Histogram(
+            'mcp_tool_serialization_seconds', "Time spent serializing tool results", ['tool'],
+            buckets=SERIALIZATION_BUCKETS, registry=self.registry
+        )
+        self.in_flight = Gauge(
+            'mcp_tool_calls_in_flight', "Tool calls in progress", ['tool'],
+            multiprocess_mode='livesum', registry=self.registry
+        )
+        if stats is not None:
+            self.registry.register(_StatsCollector(stats))
+        self._series: Dict[str, ToolSeries] = {}
+
+    def series(self, tool: str) -> ToolSeries:
+        series = self._series.get(tool)
+        if series is None:
+            series = self._series[tool] = ToolSeries(self, tool)
+        return series
+
+    def exposition(self) -> bytes:
+        """
+        Render the metrics in the Prometheus text format. When PROMETHEUS_MULTIPROC_DIR is set
+        (several workers), the tool metrics of all the workers are aggregated instead.
+        """
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(self.registry)
+
+    async def endpoint(self, request):
+        """Starlette endpoint serving the metrics."""
+        from starlette.responses import Response
+
+        return Response(self.exposition(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,259 @@
+"""
+Mock of the API described by an OpenAPI spec, for load tests and benchmarks without a live Llama Stack.
+
+Every operation answers with a JSON body synthesized from its response schema, after a latency drawn
+from a distribution. Operations without a response schema (e.g. `{}`) answer with a Llama Stack style
+list, {"data": [...]}. Array lengths and string sizes are drawn from distributions too; a few variants
+of each response are generated at startup, so serving a response costs no generation.
+
+    python mock_upstream.py ./openapi.json --port 9000 --latency exp:20 --items uniform:1:50
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from schema_compiler import SchemaCompiler
+
+DEFAULT_VARIANTS = 16
+_MAX_DEPTH = 6
+
+
+class Distribution:
+    """
+    A distribution of non-negative numbers, parsed from 'fixed:V', 'uniform:LOW:HIGH',
+    'exp:MEAN' or 'lognormal:MEDIAN:SIGMA'.
+    """
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(':')
+        try:
+            self.params = [float(p) for p in params]
+        except ValueError:
+            raise ValueError(f"Invalid distribution parameters: {spec}")
+        expected = {'fixed': 1, 'uniform': 2, 'exp': 1, 'lognormal': 2}
+        if kind not in expected or len(self.params) != expected[kind]:
+            raise ValueError(f"Invalid distribution {spec}, expected fixed:V, uniform:LOW:HIGH, exp:MEAN or lognormal:MEDIAN:SIGMA")
+        self.kind = kind
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == 'fixed':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params)
+        if self.kind == 'exp':
+            return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        median, sigma = self.params
+        return rng.lognormvariate(0, sigma) * median if median > 0 else 0.0
+
+
+class ResponseSynthesizer:
+    """Generates JSON values that are valid against compiled (self-contained) JSON Schemas."""
+
+    def __init__(self, rng: random.Random, items: Distribution, string_bytes: Distribution):
+        self.rng = rng
+        self.items = items
+        self.string_bytes = string_bytes
+
+    def _string(self, name: str = "value") -> str:
+        size = max(1, int(self.string_bytes.sample(self.rng)))
+        return (name + "-" + "x" * size)[:max(size, len(name))]
+
+    def _count(self, schema: Dict[str, Any]) -> int:
+        count = int(self.items.sample(self.rng))
+        count = max(count, schema.get('minItems', 0))
+        if 'maxItems' in schema:
+            count = min(count, schema['maxItems'])
+        return count
+
+    def generic(self) -> Dict[str, Any]:
+        """A Llama Stack style list response, for operations without a response schema."""
+        return {'data': [
+            {
+                'identifier': f"item-{i}",
+                'provider_id': "mock",
+                'type': "mock",
+                'metadata': {'description': self._string("description")},
+            }
+            for i in range(self._count({}))
+        ]}
+
+    def value(self, schema: Any, name: str = "value", depth: int = 0) -> Any:
+        if not isinstance(schema, dict) or not schema:
+            return self._string(name)
+        if 'const' in schema:
+            return schema['const']
+        if 'enum' in schema:
+            return schema['enum'][0]
+        if 'default' in schema and schema['default'] is not None:
+            return schema['default']
+        for keyword in ('anyOf', 'oneOf'):
+            if keyword in schema:
+                options = [o for o in schema[keyword] if o.get('type') != 'null'] or schema[keyword]
+                return self.value(options[0], name, depth)
+        if 'allOf' in schema:
+            merged: Dict[str, Any] = {}
+            for part in schema['allOf']:
+                merged.update(part)
+            return self.value(merged, name, depth)
+
+        schema_type = schema.get('type')
+        if isinstance(schema_type, list):
+            schema_type = next((t for t in schema_type if t != 'null'), 'null')
+        if schema_type is None:
+            schema_type = 'object' if 'properties' in schema else 'string'
+
+        if schema_type == 'object':
+            if depth >= _MAX_DEPTH:
+                return {}
+            properties = schema.get('properties', {})
+            # required properties, and optional ones on the first levels
+            names = [p for p in properties if p in schema.get('required', []) or depth < 2]
+            return {p: self.value(properties[p], p, depth + 1) for p in names}
+        if schema_type == 'array':
+            if depth >= _MAX_DEPTH:
+                return []
+            return [self.value(schema.get('items', {}), name, depth + 1) for _ in range(self._count(schema))]
+        if schema_type == 'integer':
+            return int(schema.get('minimum', 0)) + self.rng.randint(0, 100)
+        if schema_type == 'number':
+            return float(schema.get('minimum', 0)) + round(self.rng.random(), 4)
+        if schema_type == 'boolean':
+            return self.rng.random() < 0.5
+        if schema_type == 'null':
+            return None
+        return self._string(name)
+
+
+def _response_schema(operation: Dict[str, Any], compiler: SchemaCompiler) -> Optional[Dict[str, Any]]:
+    """Get the compiled schema of the first 2xx JSON response of an operation, if it has a non-empty one."""
+    for status, response in sorted(operation.get('responses', {}).items()):
+        if not str(status).startswith('2'):
+            continue
+        response = compiler.compile(response)
+        schema = response.get('content', {}).get('application/json', {}).get('schema')
+        return compiler.compile(schema) if schema else None
+    return None
+
+
+def create_app(spec_path: str, latency: Distribution, items: Distribution, string_bytes: Distribution,
+               variants: int = DEFAULT_VARIANTS, seed: int = 0):
+    """Create the Starlette app mocking every operation of a spec."""
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    with open(spec_path) as f:
+        spec = json.load(f)
+    compiler = SchemaCompiler(spec)
+    rng = random.Random(seed)
+    synthesizer = ResponseSynthesizer(rng, items, string_bytes)
+
+    # (path, method) -> pre-serialized response variants
+    responses: Dict[Tuple[str, str], List[bytes]] = {}
+    for path, path_item in spec.get('paths', {}).items():
+        for method, operation in path_item.items():
+            if method not in ('get', 'post', 'put', 'delete', 'patch'):
+                continue
+            schema = _response_schema(operation, compiler)
+            responses[(path, method.upper())] = [
+                json.dumps(synthesizer.value(schema) if schema else synthesizer.generic()).encode()
+                for _ in range(variants)
+            ]
+
+    def endpoint(path: str):
+        async def handle(request):
+            bodies = responses.get((path, request.method))
+            if bodies is None:
+                return Response(status_code=405)
+            delay = latency.sample(rng) / 1000
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return Response(rng.choice(bodies), media_type='application/json')
+        return handle
+
+    routes = [
+        Route(path, endpoint(path), methods=sorted({m for p, m in responses if p == path}))
+        for path in dict.fromkeys(p for p, _ in responses)
+    ]
+    return Starlette(routes=routes)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing is listening on port {port} after {timeout} s")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def start_mock_upstream(spec_path: str, directory: str, mock_args: Tuple[str, ...] = ()) -> Tuple[subprocess.Popen, str]:
+    """
+    Start the mock of a spec in a subprocess, and write a copy of the spec pointing at it in directory.
+    Returns the mock process and the path of the spec copy.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), os.path.abspath(spec_path), "--port", str(port), *mock_args],
+        stdout=subprocess.DEVNULL
+    )
+    with open(spec_path) as f:
+        spec = json.load(f)
+    spec["servers"] = [{"url": f"http://127.0.0.1:{port}"}]
+    mock_spec_path = os.path.join(directory, os.path.basename(spec_path))
+    with open(mock_spec_path, "w") as f:
+        json.dump(spec, f)
+    try:
+        wait_until_listening(port)
+    except RuntimeError:
+        stop_process(process)
+        raise
+    return process, mock_spec_path
+
+
+@click.command()
+@click.argument("spec_path")
+@click.option("--port", default=9000, help="Port to listen on")
+@click.option("--latency", default="fixed:0", help="Response latency distribution in ms, e.g. exp:20 or uniform:5:50")
+@click.option("--items", default="uniform:1:20", help="Distribution of array lengths")
+@click.option("--string-bytes", default="fixed:16", help="Distribution of string sizes")
+@click.option("--variants", default=DEFAULT_VARIANTS, help="Number of responses generated per operation")
+@click.option("--seed", default=0, help="Random seed, for reproducible responses")
+def main(spec_path: str, port: int, latency: str, items: str, string_bytes: str, variants: int, seed: int):
+    """Serve a mock of the API described by an OpenAPI spec."""
+    import uvicorn
+
+    try:
+        app = create_app(spec_path, Distribution(latency), Distribution(items), Distribution(string_bytes), variants, seed)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
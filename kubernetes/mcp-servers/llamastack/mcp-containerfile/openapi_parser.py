@@ -1,37 +1,184 @@
+import asyncio
+import contextlib
+import glob
+import hashlib
+import inspect
 import json
+import os
+import pathlib
+import pickle
+import re
+import tempfile
+import time
 import yaml
 import httpx
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from schema_compiler import SchemaCompiler
+from response_cache import ResponseCache
+from singleflight import SingleFlight
+from http_client import ClientSettings, RetryPolicy, UpstreamClient
+from binary_body import DEFAULT_BINARY_LIMIT, SpillDirectory, is_binary, read_binary
+
+# name of the tool argument holding a request body that is not a JSON object
+BODY_ARGUMENT = 'body'
+
+_PATH_PARAM_RE = re.compile(r"\{([^}]+)\}")
+
+
+def _compiled_version() -> str:
+    """Hash the modules defining the objects of a compiled spec (this one and the schema compiler)."""
+    digest = hashlib.sha256()
+    for path in (__file__, inspect.getfile(SchemaCompiler)):
+        digest.update(pathlib.Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# version of the compiled spec layout: compiled caches written by any other version of the modules
+# defining the compiled objects are ignored
+COMPILED_VERSION = _compiled_version()
+
+# environment variable overriding the directory of the compiled spec caches
+SPEC_CACHE_DIR_ENV = 'MCP_OPENAPI_SPEC_CACHE_DIR'
+
+# compiled caches not used for this many seconds are deleted, e.g. those of deleted spec files
+COMPILED_CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+def compiled_cache_dir() -> str:
+    """Get the directory of the compiled spec caches: $MCP_OPENAPI_SPEC_CACHE_DIR, else ~/.cache/mcp-openapi."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get(SPEC_CACHE_DIR_ENV) or os.path.join(cache_home, 'mcp-openapi')
+
+
+def _private_directory(path: str) -> bool:
+    """
+    Create a directory only the current user can write to, if it does not exist, and check that it
+    still is: a compiled cache is unpickled, so it must not be writable by anyone else.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
 
 class OpenAPISpec:
     """Class for parsing and working with OpenAPI specifications."""
 
-    def __init__(self, spec_path: str):
-        """Initialize with path to an OpenAPI spec file or URL."""
-        self.spec = self._load_spec(spec_path)
+    def __init__(self, spec: Union[str, Dict[str, Any]], digest: Optional[str] = None):
+        """Initialize with an already-parsed OpenAPI spec, or the path to an OpenAPI spec file or URL."""
+        self.spec = spec if isinstance(spec, dict) else self._load_spec(spec)
+        # content hash of the spec file, when loaded from one
+        self.digest = digest
+        self.compiled_version = COMPILED_VERSION
         self.base_url = self._get_base_url()
-
-    async def _fetch_spec(self, url: str) -> Dict[str, Any]:
-        """Fetch an OpenAPI spec from a URL."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
+        self.schema_compiler = SchemaCompiler(self.spec)
+        # endpoints are extracted once, and indexed by operation id for tool dispatch
+        self._endpoints = self._extract_endpoints()
+        self._endpoints_by_operation_id = {e['operation_id']: e for e in self._endpoints}
+
+    @classmethod
+    def from_file(cls, spec_path: str, use_cache: bool = False) -> 'OpenAPISpec':
+        """Load a local OpenAPI spec file, reading and parsing it only once."""
+        with open(spec_path, 'rb') as f:
+            return cls.from_bytes(f.read(), spec_path, use_cache)
+
+    @classmethod
+    def from_bytes(cls, content: bytes, spec_path: str, use_cache: bool = False) -> 'OpenAPISpec':
+        """
+        Create a spec from the content of a spec file.
+        With use_cache, the compiled spec (parsed and indexed) is pickled in the compiled cache
+        directory (see compiled_cache_dir), keyed by spec path and content hash, and later loads
+        of the same content skip parsing and indexing. The cache is only used if the directory
+        is private to the current user.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        cache_dir = compiled_cache_dir()
+        cache_path = cls._compiled_cache_path(cache_dir, spec_path, digest)
+        use_cache = use_cache and _private_directory(cache_dir)
+
+        if use_cache:
+            try:
+                with open(cache_path, 'rb') as f:
+                    compiled = pickle.load(f)
+                if (isinstance(compiled, cls) and compiled.digest == digest
+                        and getattr(compiled, 'compiled_version', None) == COMPILED_VERSION):
+                    # marks the cache as used, see COMPILED_CACHE_MAX_AGE
+                    os.utime(cache_path)
+                    return compiled
+            except Exception:
+                # a missing, stale or unreadable cache just means compiling again
+                pass
+
+        if spec_path.endswith('.yaml') or spec_path.endswith('.yml'):
+            spec = yaml.safe_load(content)
+        else:
+            spec = json.loads(content)
+        compiled = cls(spec, digest=digest)
+
+        if use_cache:
+            compiled._write_compiled_cache(spec_path, cache_path)
+        return compiled
+
+    @staticmethod
+    def _cache_prefix(spec_path: str) -> str:
+        """Get the start of the names of the compiled caches of a spec file, whatever its content."""
+        spec_path = os.path.abspath(spec_path)
+        return f"{os.path.basename(spec_path)}.{hashlib.sha256(spec_path.encode()).hexdigest()[:16]}."
+
+    @classmethod
+    def _compiled_cache_path(cls, cache_dir: str, spec_path: str, digest: str) -> str:
+        """Get the path of the compiled cache for a given spec file content."""
+        return os.path.join(cache_dir, f"{cls._cache_prefix(spec_path)}{digest[:16]}.compiled.pickle")
+
+    def _write_compiled_cache(self, spec_path: str, cache_path: str) -> None:
+        """Write the compiled spec cache, replacing the caches of earlier spec contents."""
+        directory = os.path.dirname(cache_path)
+        tmp_path = None
+        try:
+            # write to a temporary file first, so that concurrent readers never see a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+            tmp_path = None
+            prefix = glob.escape(self._cache_prefix(spec_path))
+            for stale_path in glob.glob(os.path.join(directory, f"{prefix}*.compiled.pickle")):
+                if stale_path != cache_path:
+                    os.remove(stale_path)
+            expired = time.time() - COMPILED_CACHE_MAX_AGE
+            for old_path in glob.glob(os.path.join(directory, "*.compiled.pickle")):
+                if os.path.getmtime(old_path) < expired:
+                    os.remove(old_path)
+        except (OSError, pickle.PicklingError):
+            # e.g. a read-only cache directory, the spec is simply compiled on each start
+            pass
+        finally:
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+
+    @staticmethod
+    def fetch(url: str) -> bytes:
+        """
+        Fetch the content of a remote OpenAPI spec. The request is synchronous, so that a spec can
+        also be loaded from within a running event loop, e.g. by a server worker at startup.
+        """
+        try:
+            response = httpx.get(url, follow_redirects=True)
             response.raise_for_status()
-            content = response.text
-
-            if url.endswith('.yaml') or url.endswith('.yml'):
-                return yaml.safe_load(content)
-            else:
-                return json.loads(content)
+        except httpx.HTTPError as e:
+            raise ValueError(f"Failed to fetch OpenAPI spec from URL: {e}")
+        return response.content
 
     def _load_spec(self, spec_path: str) -> Dict[str, Any]:
         """Load and parse the OpenAPI spec file or URL."""
         if spec_path.startswith('http://') or spec_path.startswith('https://'):
-            # For URLs, we need to run this in an event loop
-            import asyncio
-            try:
-                return asyncio.run(self._fetch_spec(spec_path))
-            except Exception as e:
-                raise ValueError(f"Failed to fetch OpenAPI spec from URL: {e}")
+            content = self.fetch(spec_path)
+            if spec_path.endswith('.yaml') or spec_path.endswith('.yml'):
+                return yaml.safe_load(content)
+            return json.loads(content)
         else:
             # For local files
             with open(spec_path, 'r') as f:
@@ -47,6 +194,14 @@ class OpenAPISpec:
         return ""
 
     def get_endpoints(self) -> List[Dict[str, Any]]:
+        """Get the endpoints of the OpenAPI spec."""
+        return self._endpoints
+
+    def get_endpoint(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        """Get the endpoint with the given operation id, if any."""
+        return self._endpoints_by_operation_id.get(operation_id)
+
+    def _extract_endpoints(self) -> List[Dict[str, Any]]:
         """Extract endpoints from the OpenAPI spec."""
         endpoints = []
 
@@ -58,48 +213,70 @@ class OpenAPISpec:
                         'method': method,
                         'operation_id': operation.get('operationId', f"{method}_{path}".replace('/', '_')),
                         'summary': operation.get('summary', ''),
+                        'tags': operation.get('tags', []),
                         'description': operation.get('description', ''),
-                        'parameters': operation.get('parameters', []),
-                        'request_body': operation.get('requestBody', {}),
+                        'parameters': self._resolve_parameters(
+                            path_item.get('parameters', []), operation.get('parameters', [])
+                        ),
+                        'request_body': self.schema_compiler.compile(operation.get('requestBody', {})),
                         'responses': operation.get('responses', {})
                     }
+                    body_schema = self._body_schema(endpoint)
+                    endpoint['request_plan'] = RequestPlan(endpoint, body_schema)
+                    endpoint['input_schema'] = self._compile_input_schema(endpoint, body_schema)
                     endpoints.append(endpoint)
 
         return endpoints
 
+    def _resolve_parameters(self, path_parameters: List[Dict[str, Any]], operation_parameters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Resolve parameter $refs, operation parameters overriding path-level ones."""
+        parameters = {}
+        for param in path_parameters + operation_parameters:
+            param = self.schema_compiler.compile(param)
+            parameters[(param['name'], param.get('in'))] = param
+        return list(parameters.values())
+
+    def _body_schema(self, endpoint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get the compiled JSON schema of the endpoint's JSON request body, if it has one."""
+        content = (endpoint.get('request_body') or {}).get('content', {})
+        if 'application/json' not in content:
+            return None
+        return self.schema_compiler.compile(content['application/json'].get('schema', {}))
+
     def generate_input_schema(self, endpoint: Dict[str, Any]) -> Dict[str, Any]:
         """Generate JSON Schema for the endpoint parameters."""
+        schema = endpoint.get('input_schema')
+        if schema is None:
+            schema = endpoint['input_schema'] = self._compile_input_schema(endpoint, self._body_schema(endpoint))
+        return schema
+
+    def _compile_input_schema(self, endpoint: Dict[str, Any], body_schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compile the JSON Schema of the endpoint parameters and request body, with all $refs resolved."""
         properties = {}
         required = []
 
         # Path and query parameters
         for param in endpoint['parameters']:
             param_name = param['name']
-            param_schema = param.get('schema', {})
-
-            properties[param_name] = {
-                'type': param_schema.get('type', 'string'),
-                'description': param.get('description', '')
-            }
+            param_schema = dict(self.schema_compiler.compile(param.get('schema', {}))) or {'type': 'string'}
+            if param.get('description'):
+                param_schema['description'] = param['description']
+            properties[param_name] = param_schema
 
             if param.get('required', False):
                 required.append(param_name)
 
         # Request body if it exists
-        if 'requestBody' in endpoint and endpoint['requestBody']:
-            content = endpoint['requestBody'].get('content', {})
-            if 'application/json' in content:
-                body_schema = content['application/json'].get('schema', {})
-
-                if 'properties' in body_schema:
-                    for prop_name, prop_schema in body_schema['properties'].items():
-                        properties[prop_name] = {
-                            'type': prop_schema.get('type', 'string'),
-                            'description': prop_schema.get('description', '')
-                        }
-
-                if 'required' in body_schema:
-                    required.extend(body_schema['required'])
+        if body_schema is not None:
+            if 'properties' in body_schema:
+                # the fields of an object body are passed as top-level arguments
+                for prop_name, prop_schema in body_schema['properties'].items():
+                    properties.setdefault(prop_name, prop_schema)
+                required.extend(r for r in body_schema.get('required', []) if r not in required)
+            else:
+                properties[BODY_ARGUMENT] = body_schema
+                if endpoint['request_body'].get('required', False):
+                    required.append(BODY_ARGUMENT)
 
         return {
             'type': 'object',
@@ -107,19 +284,95 @@ class OpenAPISpec:
             'required': required
         }
 
+class RequestPlan:
+    """Precompiled HTTP request of an endpoint: path formatter and argument locations."""
+
+    __slots__ = ('method', '_path_segments', '_path_slots', 'path_params', 'query_params', 'has_json_body', 'raw_body')
+
+    def __init__(self, endpoint: Dict[str, Any], body_schema: Optional[Dict[str, Any]] = None):
+        self.method = endpoint['method'].upper()
+
+        # the path is split into literal segments and parameter slots, e.g.
+        # '/v1/models/{model_id}' -> ['/v1/models/', '{model_id}', ''] with slot (1, 'model_id')
+        segments = _PATH_PARAM_RE.split(endpoint['path'])
+        self._path_segments = [f"{{{segment}}}" if i % 2 else segment for i, segment in enumerate(segments)]
+        self._path_slots = [(i, segment) for i, segment in enumerate(segments) if i % 2]
+
+        self.path_params = frozenset(p['name'] for p in endpoint['parameters'] if p.get('in') == 'path')
+        self.query_params = frozenset(p['name'] for p in endpoint['parameters'] if p.get('in') == 'query')
+        self.has_json_body = body_schema is not None
+        # a body that is not an object is passed whole, as the BODY_ARGUMENT argument
+        self.raw_body = self.has_json_body and 'properties' not in body_schema
+
+    def build_path(self, arguments: Dict[str, Any]) -> str:
+        """Substitute the path parameters present in the arguments."""
+        if not self._path_slots:
+            return self._path_segments[0]
+        segments = list(self._path_segments)
+        for i, name in self._path_slots:
+            if name in arguments:
+                segments[i] = str(arguments[name])
+        return "".join(segments)
+
+    def split_arguments(self, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Any]:
+        """Split tool arguments into the request path, query parameters and JSON body (None for no body)."""
+        query_params = {k: v for k, v in arguments.items() if k in self.query_params}
+        body = None
+        if self.raw_body:
+            body = arguments.get(BODY_ARGUMENT)
+        elif self.has_json_body:
+            # arguments that aren't path or query params go to the body
+            body = {
+                k: v for k, v in arguments.items()
+                if k not in self.path_params and k not in self.query_params
+            } or None
+        return self.build_path(arguments), query_params, body
+
+
 class OpenAPIToolsManager:
     """Class for creating MCP tools from OpenAPI specifications."""
 
-    def __init__(self, spec_path: str):
-        """Initialize with path to an OpenAPI spec file."""
-        self.api_spec = OpenAPISpec(spec_path)
+    def __init__(self, spec: Union[str, Dict[str, Any], OpenAPISpec], response_cache: Optional[ResponseCache] = None,
+                 coalesce: bool = True, client_settings: Optional[ClientSettings] = None,
+                 retry_policy: Optional[RetryPolicy] = None, binary_limit: int = DEFAULT_BINARY_LIMIT,
+                 spill_dir: Optional[SpillDirectory] = None, tracing: Optional[Any] = None):
+        """
+        Initialize with an OpenAPI spec, a parsed spec, or the path to an OpenAPI spec file.
+        GET calls are served from response_cache when one is given, and concurrent identical
+        GET calls share one upstream request if coalesce is set. A successful call of any other
+        method clears the response cache, since it may change what the GET calls return. Binary response bodies larger
+        than binary_limit bytes are saved to a file in spill_dir, or rejected without one.
+        Upstream requests are traced with tracing (a tracing.Tracing) if given.
+        """
+        self.tracing = tracing
+        self.response_cache = response_cache
+        self.binary_limit = binary_limit
+        self.spill_dir = spill_dir
+        self.client_settings = client_settings
+        self.retry_policy = retry_policy
+        self.single_flight = SingleFlight() if coalesce else None
+        # successful write (non-GET) calls; GET results fetched before a write are not cached or shared after it
+        self.writes = 0
+        self.load_spec(spec)
         self.client = None
+        # calls in progress, counted from the moment their tool is resolved to this manager
+        self.active_calls = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    def load_spec(self, spec: Union[str, Dict[str, Any], OpenAPISpec]) -> None:
+        """Replace the OpenAPI spec, e.g. after the spec file changed."""
+        self.api_spec = spec if isinstance(spec, OpenAPISpec) else OpenAPISpec(spec)
+        if self.response_cache is not None:
+            self.response_cache.clear()
 
     async def initialize_client(self) -> None:
         """Initialize the HTTP client."""
-        self.client = httpx.AsyncClient(
-            base_url=self.api_spec.base_url,
-            follow_redirects=True,
+        self.client = UpstreamClient(
+            self.api_spec.base_url,
+            settings=self.client_settings,
+            retry_policy=self.retry_policy,
+            tracing=self.tracing,
             headers={
                 "User-Agent": "MCP OpenAPI Tool (github.com/modelcontextprotocol/python-sdk)",
                 "Accept": "application/json"
@@ -131,6 +384,45 @@ class OpenAPIToolsManager:
         if self.client:
             await self.client.aclose()
 
+    @contextlib.contextmanager
+    def call(self):
+        """
+        Count a call in progress for the duration of the block. The call should be counted as soon as
+        its tool is resolved to this manager, so that the manager is not retired before the call starts.
+        """
+        self.active_calls += 1
+        self._drained.clear()
+        try:
+            yield
+        finally:
+            self.active_calls -= 1
+            if not self.active_calls:
+                self._drained.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the calls in progress to be done; returns whether they are."""
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def retire(self, timeout: float) -> None:
+        """Close the HTTP client once the calls in progress are done, or after timeout seconds."""
+        await self.drain(timeout)
+        await self.close_client()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters of the tool calls."""
+        stats = {}
+        if self.client is not None:
+            stats['upstream'] = self.client.stats()
+        if self.response_cache is not None:
+            stats['response_cache'] = self.response_cache.stats()
+        if self.single_flight is not None:
+            stats['coalescing'] = self.single_flight.stats()
+        return stats
+
     def get_endpoints(self) -> List[Dict[str, Any]]:
         """Get all endpoints from the OpenAPI spec."""
         return self.api_spec.get_endpoints()
@@ -141,68 +433,106 @@ class OpenAPIToolsManager:
 
     async def execute_api_call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute an API call by making the appropriate HTTP request."""
-        # Find the endpoint that corresponds to this tool name
-        matching_endpoints = [
-            e for e in self.api_spec.get_endpoints()
-            if e['operation_id'] == name
-        ]
+        with self.call():
+            return await self._execute_api_call(name, arguments)
 
-        if not matching_endpoints:
+    async def _execute_api_call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # Find the endpoint that corresponds to this tool name
+        endpoint = self.api_spec.get_endpoint(name)
+        if endpoint is None:
             raise ValueError(f"Unknown endpoint: {name}")
 
-        endpoint = matching_endpoints[0]
-        path = endpoint['path']
-        method = endpoint['method']
+        plan = endpoint['request_plan']
+        if plan.method != 'GET':
+            result = await self._request(name, plan, arguments)
+            self._invalidate()
+            return result
+
+        key = ResponseCache.key(name, arguments)
+        cache = self.response_cache
+        if cache is not None:
+            entry = cache.get(key)
+            if entry is not None and entry.is_fresh():
+                cache.record_hit()
+                return entry.result
+
+        if self.single_flight is not None:
+            # a GET call made after a write does not join one started before it
+            return await self.single_flight.do(f"{self.writes}:{key}", lambda: self._fetch(name, key, plan, arguments))
+        return await self._fetch(name, key, plan, arguments)
+
+    def _invalidate(self) -> None:
+        """Forget the GET results cached or in flight after a successful write call."""
+        self.writes += 1
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+    async def _fetch(self, name: str, key: str, plan: RequestPlan, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Make a GET call upstream, revalidating and updating its cached result if there is a cache."""
+        cache = self.response_cache
+        if cache is None:
+            return await self._request(name, plan, arguments)
+
+        writes = self.writes
+        entry = cache.get(key)
+        headers = entry.conditional_headers() if entry is not None else None
+        response = await self._send(name, plan, arguments, headers)
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            cache.record_hit(revalidated=True)
+            if self.writes == writes:
+                cache.refresh(key, name, entry, response.headers)
+            return entry.result
+
+        cache.record_miss()
+        result = await self._read_response(response)
+        # a result fetched while a write call completed may predate the write
+        if self.writes == writes and 'data' in result and not isinstance(result['data'], bytearray):
+            # binary results are not cached, to keep large payloads out of memory
+            cache.store(key, name, result, response.headers)
+        return result
+
+    async def _request(self, name: str, plan: RequestPlan, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Make the request of a call and read its response."""
+        return await self._read_response(await self._send(name, plan, arguments))
+
+    async def _send(self, name: str, plan: RequestPlan, arguments: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """Make the request of a call; the response is streamed, and must be read or closed."""
+        path, query_params, body = plan.split_arguments(arguments)
+
+        return await self.client.request(
+            name,
+            plan.method,
+            path,
+            stream=True,
+            params=query_params,
+            json=body,
+            headers=headers
+        )
 
-        # Process path parameters
-        path_params = {}
-        query_params = {}
-        body_params = {}
+    async def _read_response(self, response: httpx.Response) -> Dict[str, Any]:
+        """Raise for error statuses, and read the response by content type."""
+        try:
+            response.raise_for_status()
 
-        for param in endpoint['parameters']:
-            param_name = param['name']
-            if param_name in arguments:
-                if param['in'] == 'path':
-                    path_params[param_name] = arguments[param_name]
-                    path = path.replace(f"{{{param_name}}}", str(arguments[param_name]))
-                elif param['in'] == 'query':
-                    query_params[param_name] = arguments[param_name]
-
-        # Check if there's a request body
-        if 'requestBody' in endpoint and endpoint['requestBody']:
-            content_type = list(endpoint['requestBody'].get('content', {}).keys())
+            # Determine content type
+            content_type = response.headers.get('content-type', '')
+
+            if is_binary(content_type):
+                # binary bodies are streamed into a single buffer, or into a file when too large
+                return await read_binary(response, self.binary_limit, self.spill_dir)
+
+            await response.aread()
             if 'application/json' in content_type:
-                # Filter arguments that aren't path or query params
-                body_params = {
-                    k: v for k, v in arguments.items()
-                    if k not in path_params and k not in query_params
+                return {
+                    'content_type': 'application/json',
+                    'data': response.json()
                 }
-
-        # Make the request
-        response = None
-        if method == 'get':
-            response = await self.client.get(path, params=query_params)
-        elif method == 'post':
-            response = await self.client.post(path, params=query_params, json=body_params if body_params else None)
-        elif method == 'put':
-            response = await self.client.put(path, params=query_params, json=body_params if body_params else None)
-        elif method == 'delete':
-            response = await self.client.delete(path, params=query_params)
-        elif method == 'patch':
-            response = await self.client.patch(path, params=query_params, json=body_params if body_params else None)
-
-        response.raise_for_status()
-
-        # Determine content type
-        content_type = response.headers.get('content-type', '')
-
-        if 'application/json' in content_type:
-            return {
-                'content_type': 'application/json',
-                'data': response.json()
-            }
-        else:
-            return {
-                'content_type': content_type,
-                'data': response.text
-            }
+            else:
+                return {
+                    'content_type': content_type,
+                    'data': response.text
+                }
+        finally:
+            await response.aclose()
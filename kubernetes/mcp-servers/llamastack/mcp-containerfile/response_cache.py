@@ -0,0 +1,133 @@
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class CacheEntry:
+    """A cached tool result with the validators needed to revalidate it."""
+
+    __slots__ = ('result', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, result: Dict[str, Any], etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Get the headers of a conditional request revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU cache of GET tool results, keyed by operation_id and normalized arguments.
+
+    Entries live for the operation's TTL override if there is one, else for the
+    Cache-Control max-age of the response, else for the default TTL. Responses marked
+    no-store are not cached, and stale entries with an ETag or Last-Modified date are
+    revalidated with a conditional request.
+    """
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL, ttl_overrides: Optional[Dict[str, float]] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize the cache with a default TTL and per-operation TTL overrides (in seconds)."""
+        self.default_ttl = default_ttl
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(operation_id: str, arguments: Dict[str, Any]) -> str:
+        """Build the cache key of a call; argument order does not matter."""
+        return operation_id + ':' + json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry of a key, fresh or stale."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def record_hit(self, revalidated: bool = False) -> None:
+        self.hits += 1
+        if revalidated:
+            self.revalidations += 1
+
+    def record_miss(self) -> None:
+        self.misses += 1
+
+    def store(self, key: str, operation_id: str, result: Dict[str, Any], headers: httpx.Headers) -> None:
+        """Cache the result of a successful call according to the response headers."""
+        cache_control = headers.get('cache-control', '').lower()
+        if 'no-store' in cache_control:
+            self._entries.pop(key, None)
+            return
+
+        if operation_id in self.ttl_overrides:
+            ttl = self.ttl_overrides[operation_id]
+        elif 'no-cache' in cache_control:
+            ttl = 0.0
+        else:
+            match = _MAX_AGE_RE.search(cache_control)
+            ttl = float(match.group(1)) if match else self.default_ttl
+
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        if ttl <= 0 and not (etag or last_modified):
+            # an entry that is always stale and cannot be revalidated is useless
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = CacheEntry(result, etag, last_modified, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(self, key: str, operation_id: str, entry: CacheEntry, headers: httpx.Headers) -> None:
+        """Extend the life of an entry after a 304 Not Modified response."""
+        # a 304 may omit the validators, which then stay those of the cached response
+        merged = httpx.Headers(headers)
+        if entry.etag and 'etag' not in merged:
+            merged['etag'] = entry.etag
+        if entry.last_modified and 'last-modified' not in merged:
+            merged['last-modified'] = entry.last_modified
+        self.store(key, operation_id, entry.result, merged)
+
+    def clear(self) -> None:
+        """Drop all the entries, e.g. after the spec changed or a write call succeeded."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,139 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# name of the optional tool argument selecting the fields of a JSON result
+FIELDS_ARGUMENT = '_fields'
+
+FIELDS_SCHEMA = {
+    'type': 'array',
+    'items': {'type': 'string'},
+    'description': "Only return these fields of the JSON result, as dotted paths (e.g. data.identifier)",
+}
+
+
+def _field_tree(fields: List[str]) -> Dict[str, Any]:
+    """Turn dotted paths such as '$.data[*].identifier' into a tree of keys."""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        field = field.strip()
+        if field.startswith('$'):
+            field = field[1:]
+        node = tree
+        for key in field.replace('[*]', '').split('.'):
+            if key:
+                node = node.setdefault(key, {})
+    return tree
+
+
+def _project(data: Any, tree: Dict[str, Any]) -> Any:
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    projected = {}
+    for key, subtree in tree.items():
+        if key in data:
+            # a leaf of the tree selects the whole value
+            projected[key] = _project(data[key], subtree) if subtree else data[key]
+    return projected
+
+
+def project(data: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only the given fields of a JSON value; lists are projected item by item."""
+    if not fields:
+        return data
+    return _project(data, _field_tree(fields))
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def _size(data: Any) -> int:
+    return len(_dumps(data).encode('utf-8'))
+
+
+def _shrink_list(items: List[Any], budget: int) -> Optional[List[Any]]:
+    """Keep the longest prefix of a list that fits in budget bytes with its elision marker."""
+    low, high = 0, len(items)
+    best = None
+    while low <= high:
+        kept = (low + high) // 2
+        candidate = items[:kept] + [f"... {len(items) - kept} more items elided"]
+        if _size(candidate) <= budget:
+            best = candidate
+            low = kept + 1
+        else:
+            high = kept - 1
+    return best
+
+
+def _largest_list(data: Any, path: Tuple[str, ...] = ()) -> Optional[Tuple[int, Tuple[str, ...], List[Any]]]:
+    """Find the largest list of a JSON value, through nested objects: its size, path of keys, and items."""
+    if isinstance(data, list):
+        return _size(data), path, data
+    largest = None
+    if isinstance(data, dict):
+        for key, value in data.items():
+            found = _largest_list(value, path + (key,))
+            if found is not None and (largest is None or found[0] > largest[0]):
+                largest = found
+    return largest
+
+
+def _replace(data: Any, path: Tuple[str, ...], value: Any) -> Any:
+    """Copy a JSON value with the value at a path of keys replaced."""
+    if not path:
+        return value
+    return {**data, path[0]: _replace(data[path[0]], path[1:], value)}
+
+
+def _shrink(data: Any, budget: int) -> Optional[Any]:
+    """Shrink the largest list of a JSON value so that it fits in budget bytes, if possible."""
+    largest = _largest_list(data)
+    if largest is None:
+        return None
+    _, path, items = largest
+    rest = _size(_replace(data, path, [])) - 2
+    shrunk = _shrink_list(items, budget - rest)
+    if shrunk is None:
+        return None
+    return _replace(data, path, shrunk)
+
+
+def _truncation_marker(elided: int, total: int) -> str:
+    return f"... [truncated: {elided} of {total} bytes elided]"
+
+
+def truncate_text(text: str, budget: Optional[int]) -> str:
+    """
+    Cut a text to budget bytes, including a marker saying how much was cut. When the budget is too
+    small for the marker, the text is just cut to budget bytes.
+    """
+    encoded = text.encode('utf-8')
+    if not budget or len(encoded) <= budget:
+        return text
+    # the marker is at most as long as with all bytes elided
+    room = budget - len(_truncation_marker(len(encoded), len(encoded)))
+    if room <= 0:
+        return encoded[:budget].decode('utf-8', errors='ignore')
+    kept = encoded[:room].decode('utf-8', errors='ignore')
+    return kept + _truncation_marker(len(encoded) - len(kept.encode('utf-8')), len(encoded))
+
+
+def serialize(data: Any, budget: Optional[int] = None) -> str:
+    """
+    Serialize a JSON value compactly, within budget bytes if given.
+
+    A value that is too large has its largest list, at any depth of nested objects, cut to the
+    items that fit, followed by a marker with the number of elided items. If that is not enough,
+    the text itself is cut.
+    The result only depends on the value and the budget.
+    """
+    text = _dumps(data)
+    if not budget or len(text.encode('utf-8')) <= budget:
+        return text
+    shrunk = _shrink(data, budget)
+    if shrunk is not None:
+        return _dumps(shrunk)
+    return truncate_text(text, budget)
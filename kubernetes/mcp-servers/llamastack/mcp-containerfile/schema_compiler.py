@@ -0,0 +1,166 @@
+import json
+import time
+from typing import Any, Dict, List
+
+import click
+
+# keywords whose value is a single subschema
+_SUBSCHEMA_KEYWORDS = {'items', 'additionalProperties', 'not', 'contains', 'propertyNames', 'if', 'then', 'else'}
+# keywords whose value is a list of subschemas
+_SUBSCHEMA_LIST_KEYWORDS = {'allOf', 'anyOf', 'oneOf', 'prefixItems'}
+# keywords whose value maps names to subschemas
+_SUBSCHEMA_MAP_KEYWORDS = {'properties', 'patternProperties', 'dependentSchemas'}
+# OpenAPI-only keywords that mean nothing to a JSON Schema consumer
+_OPENAPI_ONLY_KEYWORDS = {'discriminator', 'xml', 'externalDocs'}
+
+
+class SchemaCompiler:
+    """Compiles OpenAPI schemas into self-contained JSON Schemas by inlining local $refs."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        """Initialize with a parsed OpenAPI spec."""
+        self.spec = spec
+        self._compiled_refs: Dict[str, Dict[str, Any]] = {}
+        self._resolving: List[str] = []
+        self._cycle_cuts = 0
+
+    def resolve_pointer(self, ref: str) -> Dict[str, Any]:
+        """Look up a local reference such as '#/components/schemas/Model'."""
+        if not ref.startswith('#/'):
+            raise ValueError(f"Only local references are supported: {ref}")
+        node: Any = self.spec
+        for token in ref[2:].split('/'):
+            token = token.replace('~1', '/').replace('~0', '~')
+            node = node[token]
+        return node
+
+    def compile(self, schema: Any) -> Any:
+        """Compile a schema, inlining every $ref it contains."""
+        if not isinstance(schema, dict):
+            return schema
+
+        if '$ref' in schema:
+            compiled = self._compile_ref(schema['$ref'])
+            siblings = {k: v for k, v in schema.items() if k != '$ref'}
+            if siblings:
+                # keywords next to a $ref (e.g. a description) refine the referenced schema
+                compiled = {**compiled, **self.compile(siblings)}
+            return compiled
+
+        compiled = {}
+        for key, value in schema.items():
+            if key in _OPENAPI_ONLY_KEYWORDS:
+                continue
+            if key in _SUBSCHEMA_KEYWORDS and isinstance(value, dict):
+                compiled[key] = self.compile(value)
+            elif key in _SUBSCHEMA_LIST_KEYWORDS and isinstance(value, list):
+                compiled[key] = [self.compile(item) for item in value]
+            elif key in _SUBSCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+                compiled[key] = {name: self.compile(item) for name, item in value.items()}
+            else:
+                compiled[key] = value
+
+        if compiled.pop('nullable', False) and isinstance(compiled.get('type'), str):
+            # OpenAPI 3.0 nullable becomes a JSON Schema type union
+            compiled['type'] = [compiled['type'], 'null']
+        return compiled
+
+    def _compile_ref(self, ref: str) -> Dict[str, Any]:
+        """Compile a referenced schema once, cutting reference cycles."""
+        compiled = self._compiled_refs.get(ref)
+        if compiled is not None:
+            return compiled
+
+        if ref in self._resolving:
+            # a recursive schema is cut at its second occurrence
+            self._cycle_cuts += 1
+            name = ref.rsplit('/', 1)[-1]
+            return {'type': 'object', 'description': f"Recursive {name} (see enclosing schema)"}
+
+        cycle_cuts = self._cycle_cuts
+        self._resolving.append(ref)
+        try:
+            compiled = self.compile(self.resolve_pointer(ref))
+        finally:
+            self._resolving.pop()
+
+        # a schema cut inside a cycle depends on where the cycle was entered, so it is not memoized
+        if self._cycle_cuts == cycle_cuts:
+            self._compiled_refs[ref] = compiled
+        return compiled
+
+
+def _find_refs(schema: Any, path: str = '#') -> List[str]:
+    """List the locations of the $refs left in a compiled schema."""
+    if isinstance(schema, dict):
+        found = [path] if '$ref' in schema else []
+        for key, value in schema.items():
+            found.extend(_find_refs(value, f"{path}/{key}"))
+        return found
+    if isinstance(schema, list):
+        return [ref for i, item in enumerate(schema) for ref in _find_refs(item, f"{path}/{i}")]
+    return []
+
+
+def check_input_schema(schema: Dict[str, Any]) -> List[str]:
+    """Check that a tool input schema is a self-contained JSON Schema object."""
+    problems = [f"unresolved $ref at {ref}" for ref in _find_refs(schema)]
+    if schema.get('type') != 'object':
+        problems.append("top-level type is not object")
+    missing = set(schema.get('required', [])) - set(schema.get('properties', {}))
+    if missing:
+        problems.append(f"required properties not defined: {sorted(missing)}")
+    try:
+        json.dumps(schema)
+    except (TypeError, ValueError) as e:
+        problems.append(f"not JSON serializable: {e}")
+    return problems
+
+
+@click.command()
+@click.argument('spec_path')
+@click.option("--rounds", default=20, help="Number of full-spec compilations to time")
+def main(spec_path: str, rounds: int) -> int:
+    """Time the compilation of all tool input schemas of a spec, and check that they are faithful."""
+    from openapi_parser import OpenAPISpec
+
+    with open(spec_path, 'rb') as f:
+        content = f.read()
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        api_spec = OpenAPISpec.from_bytes(content, spec_path)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    endpoints = api_spec.get_endpoints()
+    click.echo(f"Compiled {len(endpoints)} operations: "
+               f"median {timings[len(timings) // 2] * 1000:.2f} ms, min {timings[0] * 1000:.2f} ms")
+
+    try:
+        from jsonschema.validators import validator_for
+    except ImportError:
+        validator_for = None
+
+    failures = 0
+    for endpoint in endpoints:
+        schema = api_spec.generate_input_schema(endpoint)
+        problems = check_input_schema(schema)
+        if validator_for is not None:
+            try:
+                validator_for(schema).check_schema(schema)
+            except Exception as e:
+                problems.append(f"invalid JSON Schema: {e}")
+        for problem in problems:
+            failures += 1
+            click.echo(f"{endpoint['operation_id']}: {problem}", err=True)
+
+    if failures:
+        click.echo(f"{failures} problem(s) found", err=True)
+        raise SystemExit(1)
+    click.echo("All input schemas are self-contained JSON Schemas")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from openapi_parser import OpenAPISpec, OpenAPIToolsManager
+
+logger = logging.getLogger(__name__)
+
+# seconds a replaced tools manager is given to finish its calls in progress before its client is closed
+DEFAULT_DRAIN_TIMEOUT = 60.0
+
+# prefixes also name the metrics of their spec, so they are restricted to valid Prometheus name characters
+PREFIX_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+# a tool: the manager of its spec, and its endpoint
+Route = Tuple[OpenAPIToolsManager, Dict[str, Any]]
+
+
+def is_remote_spec(spec_path: str) -> bool:
+    return spec_path.startswith('http://') or spec_path.startswith('https://')
+
+
+def operation_values(values: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+    """
+    Get the values of per-tool settings that apply to the spec with prefix, keyed by operationId
+    rather than by tool name. Without a prefix, tool names are operationIds.
+    """
+    if not prefix:
+        return dict(values)
+    start = f"{prefix}_"
+    return {name[len(start):]: value for name, value in values.items() if name.startswith(start)}
+
+
+def _stat_spec(spec_path: str) -> Optional[tuple]:
+    """Get the modification time and size of a local spec file."""
+    if is_remote_spec(spec_path):
+        return None
+    try:
+        stat = os.stat(spec_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_spec(spec_path: str) -> Tuple[bytes, str]:
+    """Read a spec file, and hash its content."""
+    with open(spec_path, 'rb') as file:
+        content = file.read()
+    return content, hashlib.sha256(content).hexdigest()
+
+
+class SpecSource:
+    """One spec served by the server: the prefix of its tool names, its file or URL, and the tools manager of its current version."""
+
+    def __init__(self, prefix: str, spec_path: str, api_tools: OpenAPIToolsManager):
+        self.prefix = prefix
+        self.spec_path = spec_path
+        self.api_tools = api_tools
+        self.spec_stat = _stat_spec(spec_path)
+
+    def tool_name(self, operation_id: str) -> str:
+        return f"{self.prefix}_{operation_id}" if self.prefix else operation_id
+
+
+class SpecRegistry:
+    """
+    The specs served by one server, each with its own tools manager (base URL, connection pool,
+    response cache), and the index of their tools by name.
+
+    Local spec files are watched: a changed spec is compiled off the event loop, and the tools of
+    its source are swapped for the new ones in a single assignment. Calls in progress keep the
+    manager they started with, which is closed once they are done.
+    """
+
+    def __init__(self, specs: Dict[str, str], create_manager: Callable[[str, OpenAPISpec], OpenAPIToolsManager],
+                 spec_cache: bool = False, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT):
+        """
+        Load the specs, given as a mapping of tool name prefix to spec file or URL; the spec with
+        the empty prefix keeps the operation ids as tool names. create_manager creates the tools
+        manager of a spec, given its prefix.
+        """
+        for prefix in specs:
+            if prefix and not PREFIX_RE.match(prefix):
+                raise ValueError(f"Invalid spec prefix {prefix}, expected letters, digits and underscores")
+        self.create_manager = create_manager
+        self.spec_cache = spec_cache
+        self.drain_timeout = drain_timeout
+        self.sources = {
+            prefix: SpecSource(prefix, spec_path, create_manager(prefix, self._load(spec_path)))
+            for prefix, spec_path in specs.items()
+        }
+        self.routes = self._index(self.sources.values())
+        # incremented on each swap, so that users of the tool list know when to rebuild it
+        self.version = 0
+        # replaced managers waiting for their calls in progress, by the task closing them
+        self._retiring: Dict[asyncio.Task, OpenAPIToolsManager] = {}
+
+    def _load(self, spec_path: str) -> OpenAPISpec:
+        if is_remote_spec(spec_path):
+            return OpenAPISpec(spec_path)
+        return OpenAPISpec.from_file(spec_path, use_cache=self.spec_cache)
+
+    @staticmethod
+    def _index(sources: Any, replace: Optional[Tuple[str, OpenAPIToolsManager]] = None) -> Dict[str, Route]:
+        """Index the tools of sources by name, with the manager of one source replaced if given."""
+        routes = {}
+        for source in sources:
+            api_tools = replace[1] if replace and replace[0] == source.prefix else source.api_tools
+            for endpoint in api_tools.get_endpoints():
+                name = source.tool_name(endpoint['operation_id'])
+                if name in routes:
+                    raise ValueError(f"Tool {name} is defined by several specs, use distinct prefixes")
+                routes[name] = (api_tools, endpoint)
+        return routes
+
+    def resolve(self, name: str) -> Optional[Route]:
+        """Get the manager and endpoint of a tool."""
+        return self.routes.get(name)
+
+    def tools(self) -> Iterator[Tuple[str, OpenAPIToolsManager, Dict[str, Any]]]:
+        """Iterate over the name, manager and endpoint of every tool."""
+        for name, (api_tools, endpoint) in self.routes.items():
+            yield name, api_tools, endpoint
+
+    async def start(self) -> None:
+        """Open the HTTP clients of the specs."""
+        for source in self.sources.values():
+            await source.api_tools.initialize_client()
+
+    async def close(self) -> None:
+        """
+        Close the HTTP clients of the specs, including the replaced ones, once their calls in
+        progress are done (or after drain_timeout seconds).
+        """
+        await asyncio.gather(
+            *self._retiring,
+            *(source.api_tools.retire(self.drain_timeout) for source in self.sources.values())
+        )
+
+    async def watch(self, interval: float) -> None:
+        """Reload the changed spec files every interval seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload()
+
+    async def reload(self) -> bool:
+        """Reload the spec files whose content changed; returns whether any was reloaded."""
+        reloaded = False
+        for source in list(self.sources.values()):
+            reloaded = await self._reload(source) or reloaded
+        return reloaded
+
+    async def _reload(self, source: SpecSource) -> bool:
+        spec_stat = _stat_spec(source.spec_path)
+        if spec_stat is None or spec_stat == source.spec_stat:
+            return False
+        source.spec_stat = spec_stat
+
+        api_tools = None
+        try:
+            content, digest = await asyncio.to_thread(_read_spec, source.spec_path)
+            # the file may only have been touched, so the content hash decides
+            if digest == source.api_tools.api_spec.digest:
+                return False
+            api_spec = await asyncio.to_thread(OpenAPISpec.from_bytes, content, source.spec_path, self.spec_cache)
+            api_tools = self.create_manager(source.prefix, api_spec)
+            routes = self._index(self.sources.values(), replace=(source.prefix, api_tools))
+            await api_tools.initialize_client()
+        except Exception as e:
+            logger.error(f"Keeping the previous spec, failed to reload {source.spec_path}: {e}")
+            if api_tools is not None:
+                await api_tools.close_client()
+            return False
+
+        # no await between the two assignments: a call sees either the old or the new spec
+        previous, source.api_tools = source.api_tools, api_tools
+        self.routes = routes
+        self.version += 1
+        logger.info(f"Reloaded changed spec {source.spec_path}")
+
+        task = asyncio.create_task(previous.retire(self.drain_timeout))
+        self._retiring[task] = previous
+        task.add_done_callback(lambda done: self._retiring.pop(done, None))
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters of the tool calls, by spec prefix when there are several specs."""
+        if len(self.sources) == 1:
+            return next(iter(self.sources.values())).api_tools.stats()
+        return {
+            f"{source.prefix}_{section}" if source.prefix else section: values
+            for source in self.sources.values()
+            for section, values in source.api_tools.stats().items()
+        }
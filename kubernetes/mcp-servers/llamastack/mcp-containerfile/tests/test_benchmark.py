@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _benchmark(tool):
+    return subprocess.run(
+        [sys.executable, os.path.join(HERE, "benchmark.py"), os.path.join(HERE, "openapi.json"),
+         "--transport", "stdio", "--tool", tool, "--calls", "10", "--list-calls", "2", "--warmup", "0"],
+        cwd=HERE, capture_output=True, text=True, timeout=120
+    )
+
+
+def test_benchmark_passes():
+    result = _benchmark("endpoint_v1_models_get")
+    assert result.returncode == 0, result.stderr
+    assert "errors 0" in result.stdout
+
+
+def test_failing_tool_fails_benchmark():
+    result = _benchmark("no_such_tool")
+    assert result.returncode == 1
+    assert "stdio call_tool: 10 failed calls" in result.stderr
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+
+from openapi_parser import OpenAPIToolsManager
+from response_cache import ResponseCache
+
+SPEC = {
+    'openapi': '3.1.0',
+    'servers': [{'url': 'http://upstream'}],
+    'paths': {
+        '/v1/items': {
+            'get': {'operationId': 'list_items'},
+            'post': {
+                'operationId': 'create_item',
+                'requestBody': {'content': {'application/json': {'schema': {
+                    'type': 'object', 'properties': {'name': {'type': 'string'}}
+                }}}},
+            },
+        },
+    },
+}
+
+
+class Upstream:
+    """An in-memory items API."""
+
+    def __init__(self):
+        self.items = []
+        self.gets = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.method == 'POST':
+            self.items.append(json.loads(request.content)['name'])
+            return httpx.Response(201, json={'ok': True})
+        self.gets += 1
+        return httpx.Response(200, json=list(self.items), headers={'cache-control': 'max-age=60'})
+
+
+async def _manager(handler) -> OpenAPIToolsManager:
+    manager = OpenAPIToolsManager(SPEC, response_cache=ResponseCache())
+    await manager.initialize_client()
+    await manager.client.client.aclose()
+    manager.client.client = httpx.AsyncClient(base_url='http://upstream', transport=httpx.MockTransport(handler))
+    return manager
+
+
+def test_write_invalidates_cached_reads():
+    async def run():
+        upstream = Upstream()
+        manager = await _manager(upstream.handle)
+        try:
+            assert (await manager.execute_api_call('list_items', {}))['data'] == []
+            assert (await manager.execute_api_call('list_items', {}))['data'] == []
+            assert upstream.gets == 1
+
+            await manager.execute_api_call('create_item', {'name': 'a'})
+            assert (await manager.execute_api_call('list_items', {}))['data'] == ['a']
+            assert upstream.gets == 2
+        finally:
+            await manager.close_client()
+
+    asyncio.run(run())
+
+
+def test_read_in_flight_during_write_is_not_cached():
+    async def run():
+        upstream = Upstream()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_handle(request):
+            # the first GET is answered with the items of before the write, after the write completed
+            response = upstream.handle(request)
+            if request.method == 'GET' and upstream.gets == 1:
+                started.set()
+                await release.wait()
+            return response
+
+        manager = await _manager(slow_handle)
+        try:
+            read = asyncio.ensure_future(manager.execute_api_call('list_items', {}))
+            await started.wait()
+            await manager.execute_api_call('create_item', {'name': 'a'})
+            release.set()
+            assert (await read)['data'] == []
+            assert (await manager.execute_api_call('list_items', {}))['data'] == ['a']
+        finally:
+            await manager.close_client()
+
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+import json
+
+from result_format import serialize, truncate_text
+
+
+def test_truncate_text_marker():
+    text = truncate_text('x' * 1000, 100)
+    assert len(text.encode('utf-8')) <= 100
+    assert text.endswith('bytes elided]')
+
+
+def test_truncate_text_budget_smaller_than_marker():
+    text = truncate_text('é' * 1000, 30)
+    assert len(text.encode('utf-8')) <= 30
+    assert text == 'é' * 15
+
+
+def test_serialize_shrinks_nested_list():
+    text = serialize({'a': {'b': list(range(2000))}, 'c': [1, 2]}, 200)
+    assert len(text.encode('utf-8')) <= 200
+    data = json.loads(text)
+    assert data['c'] == [1, 2]
+    items = data['a']['b']
+    assert items[:-1] == list(range(len(items) - 1))
+    assert items[-1] == f"... {2000 - len(items) + 1} more items elided"
+
+
+def test_serialize_within_budget_is_unchanged():
+    data = {'a': {'b': [1, 2, 3]}}
+    assert serialize(data, 200) == json.dumps(data, separators=(',', ':'))
@@ -0,0 +1,30 @@
+import os
+
+from openapi_parser import OpenAPISpec
+from schema_compiler import SchemaCompiler, check_input_schema
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "openapi.json")
+
+
+def test_bundled_spec_input_schemas_are_self_contained():
+    api_spec = OpenAPISpec.from_file(SPEC_PATH)
+    endpoints = api_spec.get_endpoints()
+    assert len(endpoints) == 71
+    for endpoint in endpoints:
+        schema = api_spec.generate_input_schema(endpoint)
+        assert check_input_schema(schema) == [], endpoint['operation_id']
+
+
+def test_recursive_schema_is_cut():
+    spec = {'components': {'schemas': {'Node': {
+        'type': 'object',
+        'properties': {'children': {'type': 'array', 'items': {'$ref': '#/components/schemas/Node'}}},
+    }}}}
+    compiled = SchemaCompiler(spec).compile({'$ref': '#/components/schemas/Node'})
+    assert check_input_schema(compiled) == []
+    assert compiled['properties']['children']['items']['description'] == "Recursive Node (see enclosing schema)"
+
+
+def test_nullable_becomes_type_union():
+    compiled = SchemaCompiler({}).compile({'type': 'string', 'nullable': True})
+    assert compiled == {'type': ['string', 'null']}
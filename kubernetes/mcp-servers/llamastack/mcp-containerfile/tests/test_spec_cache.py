@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+import openapi_parser
+from openapi_parser import OpenAPISpec, SPEC_CACHE_DIR_ENV
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def spec_path(tmp_path, monkeypatch):
+    monkeypatch.setenv(SPEC_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path = tmp_path / "openapi.json"
+    shutil.copy(os.path.join(HERE, "openapi.json"), path)
+    return str(path)
+
+
+def _cache_files():
+    cache_dir = os.environ[SPEC_CACHE_DIR_ENV]
+    return [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+
+
+def _count_parses(monkeypatch):
+    calls = []
+    loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        calls.append(1)
+        return loads(*args, **kwargs)
+
+    monkeypatch.setattr(openapi_parser.json, "loads", counting_loads)
+    return calls
+
+
+def test_spec_is_parsed_once(spec_path, monkeypatch):
+    parses = _count_parses(monkeypatch)
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    assert len(parses) == 1
+    # a warm load reads the compiled cache, without parsing the spec
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    assert len(parses) == 1
+
+
+def test_one_cache_file_per_spec_and_no_temp_file(spec_path):
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    with open(spec_path) as f:
+        spec = json.load(f)
+    spec["info"]["title"] = "changed"
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+    compiled = OpenAPISpec.from_file(spec_path, use_cache=True)
+
+    # the cache of the first content was replaced, and no temporary file is left
+    files = _cache_files()
+    assert len(files) == 1
+    assert files[0].endswith(".compiled.pickle")
+    assert compiled.spec["info"]["title"] == "changed"
+    # the compiled spec takes about as much room as the compact spec
+    assert os.path.getsize(files[0]) < 2 * os.path.getsize(spec_path)
+
+
+def test_cache_in_shared_directory_is_ignored(spec_path, monkeypatch):
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    os.chmod(os.environ[SPEC_CACHE_DIR_ENV], 0o777)
+    parses = _count_parses(monkeypatch)
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    assert len(parses) == 1
+
+
+def test_cache_of_another_version_is_ignored(spec_path, monkeypatch):
+    OpenAPISpec.from_file(spec_path, use_cache=True)
+    monkeypatch.setattr(openapi_parser, "COMPILED_VERSION", "other")
+    parses = _count_parses(monkeypatch)
+    compiled = OpenAPISpec.from_file(spec_path, use_cache=True)
+    assert len(parses) == 1
+    assert compiled.compiled_version == "other"
+
+
+def _best_time(load, runs=5):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_warm_start_is_faster(spec_path):
+    cache_dir = os.environ[SPEC_CACHE_DIR_ENV]
+
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        OpenAPISpec.from_file(spec_path, use_cache=True)
+
+    cold_time = _best_time(cold)
+    warm_time = _best_time(lambda: OpenAPISpec.from_file(spec_path, use_cache=True))
+    assert warm_time < cold_time
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import httpx
+
+from mock_upstream import free_port, start_mock_upstream, stop_process, wait_until_listening
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEC_PATH = os.path.join(HERE, "openapi.json")
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _call(url, request_id, method, params):
+    payload = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    response = httpx.post(url, json=payload, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    return response.json()["result"]
+
+
+def test_workers_serve_remote_spec(tmp_path):
+    upstream, mock_spec_path = start_mock_upstream(SPEC_PATH, str(tmp_path))
+    spec_port = free_port()
+    spec_server = subprocess.Popen(
+        [sys.executable, "-m", "http.server", str(spec_port), "--bind", "127.0.0.1"],
+        cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    port = free_port()
+    server = None
+    try:
+        wait_until_listening(spec_port)
+        spec_url = f"http://127.0.0.1:{spec_port}/{os.path.basename(mock_spec_path)}"
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "mcp_server.py"), spec_url,
+             "--transport", "streamable-http", "--port", str(port), "--workers", "2"],
+            cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        wait_until_listening(port)
+        url = f"http://127.0.0.1:{port}/mcp/"
+
+        # enough requests for both workers to serve some
+        for request_id in range(8):
+            tools = _call(url, request_id, "tools/list", {})["tools"]
+            assert len(tools) == 71
+            result = _call(url, request_id, "tools/call", {"name": "endpoint_v1_models_get", "arguments": {}})
+            assert not result.get("isError")
+        assert server.poll() is None
+    finally:
+        if server is not None:
+            stop_process(server)
+        stop_process(spec_server)
+        stop_process(upstream)
@@ -0,0 +1,100 @@
+import fnmatch
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import yaml
+
+import mcp.types as types
+
+
+class ToolFilter:
+    """
+    Selects the operations exposed as tools, by tag, path glob or tool name. A tool is named
+    after its operationId, prefixed with the prefix of its spec when the server has several.
+
+    An operation is selected if it matches one of the include rules (or if there are
+    none), and none of the exclude rules.
+    """
+
+    def __init__(self, include_tags: Iterable[str] = (), exclude_tags: Iterable[str] = (),
+                 include_paths: Iterable[str] = (), exclude_paths: Iterable[str] = (),
+                 include_operations: Iterable[str] = (), exclude_operations: Iterable[str] = ()):
+        """Initialize with tag names, path globs (e.g. '/v1/models*') and tool names."""
+        self.include_tags = set(include_tags)
+        self.exclude_tags = set(exclude_tags)
+        self.include_paths = list(include_paths)
+        self.exclude_paths = list(exclude_paths)
+        self.include_operations = set(include_operations)
+        self.exclude_operations = set(exclude_operations)
+
+    @classmethod
+    def from_file(cls, path: str, **extra_rules: Iterable[str]) -> 'ToolFilter':
+        """
+        Load the rules of a YAML or JSON file of the form
+        {include: {tags: [...], paths: [...], operations: [...]}, exclude: {...}},
+        adding the extra rules (keyword arguments of __init__) to them.
+        """
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+
+        rules: Dict[str, List[str]] = {}
+        for kind in ('include', 'exclude'):
+            section = config.get(kind) or {}
+            for key in ('tags', 'paths', 'operations'):
+                rules[f"{kind}_{key}"] = list(section.get(key) or [])
+        for name, values in extra_rules.items():
+            rules[name] = rules.get(name, []) + list(values)
+        return cls(**rules)
+
+    def is_empty(self) -> bool:
+        return not (self.include_tags or self.exclude_tags or self.include_paths or self.exclude_paths
+                    or self.include_operations or self.exclude_operations)
+
+    def _matches(self, endpoint: Dict[str, Any], name: str, tags: set, paths: List[str], operations: set) -> bool:
+        return (
+            name in operations
+            or not tags.isdisjoint(endpoint.get('tags', []))
+            or any(fnmatch.fnmatchcase(endpoint['path'], pattern) for pattern in paths)
+        )
+
+    def selects(self, endpoint: Dict[str, Any], name: Optional[str] = None) -> bool:
+        """Check whether an endpoint is exposed as a tool; name is the name of its tool, its operationId by default."""
+        name = name or endpoint['operation_id']
+        if (self.include_tags or self.include_paths or self.include_operations) and not self._matches(
+                endpoint, name, self.include_tags, self.include_paths, self.include_operations):
+            return False
+        return not self._matches(endpoint, name, self.exclude_tags, self.exclude_paths, self.exclude_operations)
+
+
+def estimate_tokens(text: str) -> int:
+    """Count the tokens of a text with tiktoken if it is installed, else estimate them (~4 characters per token)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return (len(text) + 3) // 4
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def tool_tokens(tool: types.Tool) -> int:
+    """Estimate the prompt tokens of a tool definition."""
+    return estimate_tokens(json.dumps(tool.model_dump(exclude_none=True), separators=(',', ':')))
+
+
+def footprint_report(all_tools: List[types.Tool], selected_tools: List[types.Tool], top: Optional[int] = 20) -> str:
+    """Report the token footprint of the selected tools, compared to all the tools of the spec."""
+    selected = sorted(((tool_tokens(tool), tool.name) for tool in selected_tools), reverse=True)
+    all_total = sum(tool_tokens(tool) for tool in all_tools)
+    selected_total = sum(tokens for tokens, _ in selected)
+
+    lines = [
+        f"{len(selected_tools)} of {len(all_tools)} tools selected",
+        f"~{selected_total} of ~{all_total} tokens per turn"
+        + (f" ({selected_total / all_total:.1%})" if all_total else ""),
+        "",
+        f"{'tokens':>8}  tool",
+    ]
+    for tokens, name in selected[:top]:
+        lines.append(f"{tokens:>8}  {name}")
+    if top is not None and len(selected) > top:
+        lines.append(f"{'':>8}  ... and {len(selected) - top} more")
+    return "\n".join(lines)
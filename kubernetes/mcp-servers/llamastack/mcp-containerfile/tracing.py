@@ -0,0 +1,91 @@
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None
+
+DEFAULT_SERVICE_NAME = "mcp-openapi-server"
+
+
+def configure_tracing(service_name: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+    """
+    Export spans over OTLP/HTTP. The endpoint defaults to the standard OTEL_EXPORTER_OTLP_*
+    environment variables, e.g. http://localhost:4318/v1/traces for a collector sidecar.
+    """
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise RuntimeError(
+            "Tracing requires the OpenTelemetry SDK, install it with: "
+            "pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http"
+        ) from e
+
+    service_name = service_name or os.getenv("OTEL_SERVICE_NAME", DEFAULT_SERVICE_NAME)
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+
+
+class Tracing:
+    """
+    Spans of the tool calls and of their upstream requests.
+
+    A tool call span continues the trace context of the MCP request (its HTTP headers or its
+    _meta), and the context of the upstream request spans is propagated to the API in a
+    traceparent header.
+    """
+
+    def __init__(self):
+        if trace is None:
+            raise RuntimeError("Tracing requires OpenTelemetry, install it with: pip install opentelemetry-api")
+        self.tracer = trace.get_tracer("mcp_openapi_server")
+
+    def tool_span(self, name: str, carrier: Optional[Dict[str, Any]] = None):
+        """Start the span of a tool call, as a child of the trace context found in carrier."""
+        context = propagate.extract(carrier) if carrier else None
+        return self.tracer.start_as_current_span(
+            f"tools/call {name}",
+            context=context,
+            kind=SpanKind.SERVER,
+            attributes={"rpc.system": "mcp", "rpc.method": "tools/call", "mcp.tool.name": name},
+        )
+
+    def request_span(self, operation_id: str, request: httpx.Request, attempt: int):
+        """Start the span of one attempt of an upstream request."""
+        return self.tracer.start_as_current_span(
+            f"{request.method} {operation_id}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "http.request.method": request.method,
+                "url.full": str(request.url),
+                "server.address": request.url.host,
+                "http.request.resend_count": attempt,
+                "openapi.operation_id": operation_id,
+            },
+        )
+
+    @staticmethod
+    def inject(request: httpx.Request) -> None:
+        """Add the current trace context to the headers of a request."""
+        propagate.inject(request.headers)
+
+    @staticmethod
+    def record_response(span: Any, response: httpx.Response) -> None:
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.set_status(Status(StatusCode.ERROR, f"HTTP {response.status_code}"))
+
+    @staticmethod
+    def record_error(error: BaseException) -> None:
+        """Mark the current span as failed."""
+        span = trace.get_current_span()
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))